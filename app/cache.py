@@ -177,18 +177,21 @@ def _init_caches():
             RedisCache(client, "kg:vector", default_ttl=7200),   # 2h
             RedisCache(client, "kg:graph", default_ttl=7200),    # 2h
             RedisCache(client, "kg:entity", default_ttl=14400),  # 4h
+            RedisCache(client, "kg:extraction", default_ttl=settings.extraction_cache_ttl),
         )
     except Exception as e:
+        from app.config import settings
         logger.warning(f"Redis unavailable ({e}), using in-memory cache")
         return (
             TTLCache(default_ttl=3600),
             TTLCache(default_ttl=1800),
             TTLCache(default_ttl=1800),
             TTLCache(default_ttl=7200),
+            TTLCache(default_ttl=settings.extraction_cache_ttl),
         )
 
 
-query_cache, vector_cache, graph_cache, entity_cache = _init_caches()
+query_cache, vector_cache, graph_cache, entity_cache, extraction_cache = _init_caches()
 
 
 def get_all_cache_stats() -> dict:
@@ -197,11 +200,16 @@ def get_all_cache_stats() -> dict:
         "vector": vector_cache.stats,
         "graph": graph_cache.stats,
         "entity": entity_cache.stats,
+        "extraction": extraction_cache.stats,
     }
 
 
 def invalidate_on_sync():
-    """Clear all caches on sync/reindex."""
+    """Clear all caches on sync/reindex.
+
+    The extraction cache is keyed by document content, not graph state, so it
+    is kept: reindexing unchanged documents is exactly what it is for.
+    """
     query_cache.clear()
     vector_cache.clear()
     graph_cache.clear()
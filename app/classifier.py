@@ -1,9 +1,8 @@
 import json
 import logging
 
-from openai import AsyncOpenAI
-
 from app.config import settings
+from app.llm_client import get_llm_client
 from app.retry import retry_with_backoff
 
 logger = logging.getLogger(__name__)
@@ -45,12 +44,13 @@ Document content (first 3000 chars):
 
 class DocumentClassifier:
     def __init__(self):
-        self.client = AsyncOpenAI(
-            base_url=settings.litellm_url,
-            api_key=settings.litellm_api_key,
-        )
         self.model = settings.gemini_model
 
+    @property
+    def client(self):
+        # Looked up per call: close_llm_client() drops the shared client on shutdown
+        return get_llm_client()
+
     async def classify(self, title: str, content: str) -> dict:
         """Classify a document into one of the predefined types."""
         truncated = content[:3000]
@@ -23,6 +23,11 @@ class Settings(BaseSettings):
     neo4j_uri: str = "bolt://neo4j:7687"
     neo4j_user: str = "neo4j"
     neo4j_password: str = ""
+    neo4j_database: str = "neo4j"
+    # Bolt connection pool; roughly 2x the concurrent documents in flight.
+    # Acquisition waits longer than the timeout fail instead of stalling silently.
+    neo4j_pool_size: int = 50
+    neo4j_acquisition_timeout: float = 30.0
 
     postgres_host: str = "pgvector"
     postgres_port: int = 5432
@@ -36,6 +41,29 @@ class Settings(BaseSettings):
     owner_context: str = ""
 
     max_concurrent_docs: int = 10
+    # One combined extraction request per document; True restores the separate
+    # metadata/entity/relationship passes (kept for quality comparisons).
+    multi_pass_extraction: bool = False
+    # Combined mode self-verifies in the prompt; run the separate verification
+    # call only when at least this many entities come back.
+    combined_verification_min_entities: int = 16
+    # Enforce entity/relationship JSON schemas server-side (structured outputs);
+    # leave off for LiteLLM routes whose provider doesn't support json_schema.
+    use_strict_schema: bool = False
+    # "vllm" when LiteLLM routes to a self-hosted vLLM: schemas are sent as
+    # guided_json for grammar-constrained decoding instead.
+    llm_backend: str = ""
+    # Mark the static system prompt with cache_control (Anthropic-style prompt
+    # caching); OpenAI and Gemini cache the shared prefix automatically.
+    prompt_cache_control: bool = False
+    # Connection pool of the shared LiteLLM client
+    llm_max_connections: int = 100
+    # Proactive LiteLLM request/token budgets for extraction (0 = unlimited)
+    llm_rpm: int = 0
+    llm_tpm: int = 0
+    # LLM extraction results keyed by content hash; reused across reindexes
+    enable_extraction_cache: bool = True
+    extraction_cache_ttl: int = 604800  # 7 days
     auto_sync_interval_minutes: int = 0
     entity_steward_interval_minutes: int = 360
     entity_steward_candidate_limit: int = 40
@@ -3,9 +3,9 @@ import re
 from typing import Optional
 
 import asyncpg
-from openai import AsyncOpenAI
 
 from app.config import settings
+from app.llm_client import get_llm_client
 from app.retry import retry_db, retry_with_backoff
 
 logger = logging.getLogger(__name__)
@@ -197,12 +197,13 @@ def chunk_text(content: str, chunk_size: int = 4000, overlap: int = 800) -> list
 class EmbeddingsStore:
     def __init__(self):
         self.pool: Optional[asyncpg.Pool] = None
-        self.openai = AsyncOpenAI(
-            base_url=settings.litellm_url,
-            api_key=settings.litellm_api_key,
-        )
         self.model = settings.embedding_model
 
+    @property
+    def openai(self):
+        # Looked up per call: close_llm_client() drops the shared client on shutdown
+        return get_llm_client()
+
     async def init(self):
         self.pool = await asyncpg.create_pool(
             host=settings.postgres_host,
@@ -307,6 +308,26 @@ class EmbeddingsStore:
             logger.error(f"Embedding generation failed: {e}")
             return []
 
+    async def generate_embeddings_batch(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for several texts in one request.
+
+        Results line up with `texts`; on failure every slot is an empty list,
+        matching generate_embedding's failure value.
+        """
+        if not texts:
+            return []
+        try:
+            async def _call():
+                resp = await self.openai.embeddings.create(
+                    model=self.model,
+                    input=[text[:24000] for text in texts],
+                )
+                return [item.embedding for item in sorted(resp.data, key=lambda item: item.index)]
+            return await retry_with_backoff(_call, operation='generate_embeddings_batch')
+        except Exception as e:
+            logger.error(f"Batch embedding generation failed: {e}")
+            return [[] for _ in texts]
+
     async def generate_rich_embedding(self, name: str, entity_type: str = "",
                                        description: str = "", connected_names: list[str] = None) -> list[float]:
         """Generate a richer embedding for entities: name + type + description + connections."""
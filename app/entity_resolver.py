@@ -1,11 +1,18 @@
+import asyncio
 import logging
 import re
-from typing import Any, Optional
+import sys
+import time
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional
 
-from rapidfuzz import fuzz
+import numpy as np
+from rapidfuzz import fuzz, process
 
+from app.config import settings
 from app.embeddings import embeddings_store
-from app.graph import graph_store
+from app.graph import UUID_LABELS, EntityRecord, graph_store
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +22,9 @@ PROTECTED_PERSON_NAMES = {
     "ggarbo", "ggarbo mccarn", "ggarbo mccam", "ggarbo mccarm",
 }
 
+# Max cluster merges in flight during resolve_all_entities
+MERGE_CONCURRENCY = 8
+
 # LLM tiebreaker score thresholds for entity resolution
 LLM_TIEBREAKER_LOW = 0.6   # Below this: definitely don't merge
 LLM_TIEBREAKER_HIGH = 0.85  # Above this: definitely merge
@@ -25,6 +35,8 @@ LLM_MERGE_HIGH = 85       # 70-85 zone: use LLM to decide
 _merge_llm_cache: dict[str, bool] = {}
 SHORT_NAME_THRESHOLD = 95  # Names ≤5 chars need this score or higher
 EMBEDDING_THRESHOLD = 0.88
+EMBEDDING_CACHE_SIZE = 10_000     # Name embeddings kept by the resolver (LRU)
+EMBEDDING_RETRY_SECONDS = 300     # Don't re-request a failed name embedding sooner than this
 NAME_PARTS_THRESHOLD = 0.70
 
 # Common business suffixes to strip before comparing org names
@@ -57,6 +69,18 @@ TITLE_PREFIXES = {
 # Business suffixes that shouldn't appear at the START of a name
 BUSINESS_PREFIX_SUFFIXES = {"llc", "inc", "corp", "ltd", "co", "the"}
 
+# Characters that make a name a worse canonical candidate
+_UNCLEAN_NAME_CHARS = re.compile(r'[0-9#@&%]')
+
+# Punctuation/symbols replaced by spaces in normalize_name
+_SPECIAL_NAME_CHARS = str.maketrans({c: " " for c in "\u2122\u00ae\u00a9.-'"})
+
+# "<left> & <right>" / "<left> and <right>" in detect_joint_name
+_JOINT_NAME_SEPARATOR = re.compile(r'^(.+?)\s+(?:&|and)\s+(.+)$', re.IGNORECASE)
+
+# Memo size for the pure name helpers; a dedup pass hits each name O(N) times
+_NAME_CACHE_SIZE = 100_000
+
 
 def _coerce_text(value: Any) -> str:
     if value is None:
@@ -92,13 +116,17 @@ def normalize_name(name: str) -> str:
     name = _coerce_text(name)
     if not name:
         return ""
+    return _normalize_text(name)
+
+
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
+def _normalize_text(name: str) -> str:
     # Handle "LAST, FIRST" format
     if "," in name and len(name.split(",")) == 2:
         parts = name.split(",")
         name = f"{parts[1].strip()} {parts[0].strip()}"
     # Remove special chars, extra spaces
-    name = re.sub(r"[\u2122\u00ae\u00a9.\-\']", " ", name)
-    name = re.sub(r"\s+", " ", name).strip()
+    name = " ".join(name.translate(_SPECIAL_NAME_CHARS).split())
     return name
 
 
@@ -128,21 +156,24 @@ def normalize_org_name(name: str) -> str:
     return " ".join(parts)
 
 
-def get_name_parts(name: str) -> list[str]:
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
+def get_name_parts(name: str) -> tuple[str, ...]:
     """Get significant name parts (lowercased, no initials)."""
     normalized = normalize_name(name).lower()
     parts = normalized.split()
-    return [p for p in parts if len(p) > 1]
+    return tuple(p for p in parts if len(p) > 1)
 
 
-def get_distinctive_org_words(name: str) -> set[str]:
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
+def get_distinctive_org_words(name: str) -> frozenset[str]:
     """Get distinctive words from an org name (strip common business suffixes)."""
     normalized = normalize_name(name).lower()
     parts = normalized.split()
-    distinctive = {p for p in parts if p not in COMMON_ORG_SUFFIXES and len(p) > 1}
+    distinctive = frozenset(p for p in parts if p not in COMMON_ORG_SUFFIXES and len(p) > 1)
     return distinctive
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
 def is_short_name(name: str) -> bool:
     """Check if a name is too short to be reliably fuzzy-matched."""
     normalized = normalize_name(name).strip()
@@ -164,14 +195,19 @@ def is_initial_of(short: str, long: str) -> bool:
     return s == l or ABBREVIATIONS.get(s, s) == l
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
+def _name_tokens(name: str) -> tuple[str, ...]:
+    return tuple(normalize_name(name).lower().split())
+
+
 def name_parts_match_score(name_a: str, name_b: str) -> float:
     """Score how well two names match based on name parts.
     
     Handles: case differences, initials, abbreviations, name ordering.
     Returns 0.0-1.0.
     """
-    parts_a = normalize_name(name_a).lower().split()
-    parts_b = normalize_name(name_b).lower().split()
+    parts_a = _name_tokens(name_a)
+    parts_b = _name_tokens(name_b)
     
     if not parts_a or not parts_b:
         return 0.0
@@ -179,25 +215,28 @@ def name_parts_match_score(name_a: str, name_b: str) -> float:
     shorter, longer = (parts_a, parts_b) if len(parts_a) <= len(parts_b) else (parts_b, parts_a)
     
     matched = 0
-    used = set()
+    used = bytearray(len(longer))
     
     for sp in shorter:
+        sp_len = len(sp)
         for i, lp in enumerate(longer):
-            if i in used:
+            if used[i]:
                 continue
             if sp == lp:
                 matched += 1
-                used.add(i)
+                used[i] = 1
                 break
             if is_initial_of(sp, lp) or is_initial_of(lp, sp):
                 matched += 0.8
-                used.add(i)
+                used[i] = 1
                 break
-            if len(sp) > 2 and len(lp) > 2:
-                ratio = fuzz.ratio(sp, lp)
-                if ratio >= 80:
+            lp_len = len(lp)
+            # ratio >= 80 needs the longer part to be at most 1.5x the shorter
+            if sp_len > 2 and lp_len > 2 and 2 * max(sp_len, lp_len) <= 3 * min(sp_len, lp_len):
+                ratio = fuzz.ratio(sp, lp, score_cutoff=80)
+                if ratio:
                     matched += ratio / 100.0
-                    used.add(i)
+                    used[i] = 1
                     break
     
     coverage_short = matched / len(shorter) if shorter else 0
@@ -233,54 +272,43 @@ def detect_joint_name(name: str) -> list[str]:
     - "BLAKE T MCCARN CHELSEA J MCCARN" (two full names concatenated)
     - "MCCARN BLAKE THOMAS & MCCARN CHELSEA JOYCE"
     """
-    parts = normalize_name(name).split()
+    joined = normalize_name(name)
+    parts = joined.split()
     if len(parts) <= 3:
         return [name]
     
-    joined = " ".join(parts)
-    
     # Pattern: "First [M] & First [M] Last" or "First [M] Last & First [M] Last"
     # Match on & or "and"
-    and_patterns = [
-        r'^(.+?)\s+(?:&|and)\s+(.+)$',
-    ]
-    for pat in and_patterns:
-        m = re.match(pat, joined, re.IGNORECASE)
-        if m:
-            left = m.group(1).strip()
-            right = m.group(2).strip()
-            # If left has no last name, borrow from right
-            left_parts = left.split()
-            right_parts = right.split()
-            if len(left_parts) <= 2 and len(right_parts) >= 2:
-                # Assume last word of right is shared surname
-                surname = right_parts[-1]
-                if not any(w.lower() == surname.lower() for w in left_parts):
-                    left = left + " " + surname
-            return [left, right]
+    m = _JOINT_NAME_SEPARATOR.match(joined)
+    if m:
+        left = m.group(1).strip()
+        right = m.group(2).strip()
+        # If left has no last name, borrow from right
+        left_parts = left.split()
+        right_parts = right.split()
+        if len(left_parts) <= 2 and len(right_parts) >= 2:
+            # Assume last word of right is shared surname
+            surname = right_parts[-1]
+            surname_lower = surname.lower()
+            if not any(w.lower() == surname_lower for w in left_parts):
+                left = left + " " + surname
+        return [left, right]
     
     # Pattern: Two full names concatenated without separator
     # e.g., "BLAKE T MCCARN CHELSEA J MCCARN" — 6 parts, two 3-part names
-    # Heuristic: if last name appears twice, split there
+    # Heuristic: if a word appears twice (likely a shared surname), split
+    # right after its first occurrence. Both halves must look like names
+    # (2-4 parts each), so only the 2nd-4th words can end the left half.
     if len(parts) >= 5:
-        # Check if any word appears twice (likely a shared surname)
         lower_parts = [p.lower() for p in parts]
-        for i, word in enumerate(lower_parts):
-            if len(word) < 3:
-                continue
-            # Find second occurrence
-            try:
-                j = lower_parts.index(word, i + 1)
-            except ValueError:
+        last_seen = {word: idx for idx, word in enumerate(lower_parts)}
+        for i in range(1, min(4, len(parts) - 2)):
+            word = lower_parts[i]
+            if len(word) < 3 or last_seen[word] <= i:
                 continue
-            # Split: parts[0:j] and parts[j:]
-            # But only if both halves look like names (2-4 parts each)
-            left = parts[0:j+1] if j < len(parts) - 1 else parts[0:j]
-            right = parts[j+1:] if j < len(parts) - 1 else parts[j:]
-            # Actually split at the boundary: first name ends at first occurrence of surname
-            left = parts[0:i+1]
-            right = parts[i+1:]
-            if 2 <= len(left) <= 4 and 2 <= len(right) <= 4:
+            if len(parts) - (i + 1) <= 4:
+                left = parts[:i + 1]
+                right = parts[i + 1:]
                 logger.info(f"Detected concatenated names: '{name}' -> {[' '.join(left), ' '.join(right)]}")
                 return [" ".join(left), " ".join(right)]
     
@@ -354,6 +382,10 @@ def should_auto_merge(name_a: str, name_b: str, score: float,
     
     Returns True only if all safeguards pass.
     """
+    # Must meet threshold (cheapest check, and it rejects most pairs)
+    if score < (SIMILARITY_THRESHOLD / 100.0):
+        return False
+
     # Minimum name length protection
     if len(normalize_name(name_a).strip()) < 4 or len(normalize_name(name_b).strip()) < 4:
         logger.debug(
@@ -394,15 +426,6 @@ def should_auto_merge(name_a: str, name_b: str, score: float,
                 )
                 return False
 
-    # Short name protection
-    if is_short_name(name_a) or is_short_name(name_b):
-        if score < (SHORT_NAME_THRESHOLD / 100.0):
-            logger.debug(
-                f"Short name protection blocked merge: '{name_a}' <-> '{name_b}' "
-                f"(score={score:.3f}, need {SHORT_NAME_THRESHOLD}%)"
-            )
-            return False
-    
     # Organization specificity check
     if entity_type == "Organization":
         if not org_distinctive_match(name_a, name_b):
@@ -412,13 +435,34 @@ def should_auto_merge(name_a: str, name_b: str, score: float,
             )
             return False
     
-    # Must meet threshold
-    if score < (SIMILARITY_THRESHOLD / 100.0):
-        return False
+    # Short name protection
+    if is_short_name(name_a) or is_short_name(name_b):
+        if score < (SHORT_NAME_THRESHOLD / 100.0):
+            logger.debug(
+                f"Short name protection blocked merge: '{name_a}' <-> '{name_b}' "
+                f"(score={score:.3f}, need {SHORT_NAME_THRESHOLD}%)"
+            )
+            return False
     
     return True
 
 
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
+def _char_mask(text: str) -> int:
+    """64-bit presence mask of the non-space characters in text (hashed by code point)."""
+    mask = 0
+    for ch in set(text):
+        if ch != " ":
+            mask |= 1 << (ord(ch) & 63)
+    return mask
+
+
+@lru_cache(maxsize=_NAME_CACHE_SIZE)
+def _token_sorted(text: str) -> str:
+    """The string fuzz.token_sort_ratio compares: whitespace tokens sorted and rejoined."""
+    return " ".join(sorted(text.split()))
+
+
 def advanced_match_score(name_a: str, name_b: str, entity_type: str = "Person") -> float:
     """Combined matching score using multiple strategies.
     
@@ -427,8 +471,14 @@ def advanced_match_score(name_a: str, name_b: str, entity_type: str = "Person")
     """
     norm_a = normalize_name(name_a).lower()
     norm_b = normalize_name(name_b).lower()
+    if norm_a == norm_b:
+        return 1.0
+    # No character in common besides spaces: shared spaces alone keep every
+    # scorer strictly below 0.5, under all of the resolver's thresholds
+    if not _char_mask(norm_a) & _char_mask(norm_b):
+        return 0.0
     fuzzy_score = fuzz.ratio(norm_a, norm_b) / 100.0
-    token_sort = fuzz.token_sort_ratio(norm_a, norm_b) / 100.0
+    token_sort = fuzz.ratio(_token_sorted(norm_a), _token_sorted(norm_b)) / 100.0
     parts_score = name_parts_match_score(name_a, name_b)
     
     if entity_type == "Person":
@@ -441,6 +491,107 @@ def advanced_match_score(name_a: str, name_b: str, entity_type: str = "Person")
         return max(fuzzy_score, token_sort, parts_score, token_set * 0.95)
 
 
+# Rows per block when sweeping the pair matrix in _candidate_pairs
+_PAIR_BLOCK_ROWS = 512
+
+
+def _score_matrix(queries: list[str], choices: list[str], entity_type: str = "Person",
+                  score_cutoff: float = 0) -> np.ndarray:
+    """Batch version of the rapidfuzz half of advanced_match_score.
+
+    Each scorer runs once over every query/choice pair via ``process.cdist``
+    and the results are combined with a vectorized max, so the quadratic
+    part of a dedup pass stays in C. Inputs must already be normalized and
+    lowercased. Scores are on rapidfuzz's 0-100 scale; name_parts_match_score
+    is not included and is left to the caller for the surviving pairs.
+
+    With score_cutoff, scorers may bail out early and cells below the cutoff
+    come back as 0; cells at or above it are exact.
+    """
+    scores = process.cdist(queries, choices, scorer=fuzz.ratio, dtype=np.float32,
+                           workers=-1, score_cutoff=score_cutoff)
+    # token_sort_ratio is ratio over token-sorted strings; sort each name once
+    # instead of once per pair inside rapidfuzz
+    np.maximum(
+        scores,
+        process.cdist([_token_sorted(q) for q in queries], [_token_sorted(c) for c in choices],
+                      scorer=fuzz.ratio, dtype=np.float32, workers=-1, score_cutoff=score_cutoff),
+        out=scores,
+    )
+    if entity_type != "Person":
+        # token_set is damped by 0.95, so anything it zeroes below the cutoff
+        # could not have reached the cutoff anyway
+        token_set = process.cdist(queries, choices, scorer=fuzz.token_set_ratio, dtype=np.float32,
+                                  workers=-1, score_cutoff=score_cutoff)
+        np.maximum(scores, token_set * 0.95, out=scores)
+    return scores
+
+
+def _name_parts_candidates(names: list[str], owners: list[int], is_alias: list[bool],
+                           floor: float) -> set[tuple[int, int]]:
+    """Owner pairs (i < j) whose name_parts_match_score might reach `floor`.
+
+    name_parts_match_score credits whole tokens, initials, abbreviations and
+    per-token fuzzy matches, which the whole-string scorers in _score_matrix
+    don't see: "B McCarn" / "Blake Thomas McCarn" reaches 0.81 on parts alone.
+    A superset of such pairs is found through an index of what each token can
+    match. Same-owner and alias-vs-alias combinations are skipped, as in
+    _candidate_pairs.
+    """
+    tokens = [_name_tokens(name) for name in names]
+
+    # Per-token fuzzy matches (ratio >= 80 between tokens longer than 2 whose
+    # lengths are within 1.5x), found once over the vocabulary
+    vocab = sorted({token for item_tokens in tokens for token in item_tokens if len(token) > 2})
+    similar: dict[str, list[str]] = defaultdict(list)
+    for start in range(0, len(vocab), _PAIR_BLOCK_ROWS):
+        block = process.cdist(vocab[start:start + _PAIR_BLOCK_ROWS], vocab, scorer=fuzz.ratio,
+                              dtype=np.float32, workers=-1, score_cutoff=80)
+        for r, c in zip(*(idx.tolist() for idx in np.nonzero(block))):
+            a, b = vocab[start + r], vocab[c]
+            if a != b and 2 * max(len(a), len(b)) <= 3 * min(len(a), len(b)):
+                similar[a].append(b)
+
+    def _keys(token: str) -> set[str]:
+        bare = token.rstrip(".")
+        return {token, bare, ABBREVIATIONS.get(bare, bare), *similar.get(token, ())}
+
+    postings: dict[str, set[int]] = defaultdict(set)    # key -> items with a token under it
+    by_first: dict[str, set[int]] = defaultdict(set)    # first char -> items with a token starting with it
+    by_initial: dict[str, set[int]] = defaultdict(set)  # letter -> items with that single-letter token
+    for item, item_tokens in enumerate(tokens):
+        for token in item_tokens:
+            for key in _keys(token):
+                postings[key].add(item)
+            by_first[token[:1]].add(item)
+            bare = token.rstrip(".")
+            if len(bare) == 1:
+                by_initial[bare].add(item)
+
+    def _matches(token: str) -> set[int]:
+        # Items with a token this one could match on (is_initial_of both ways)
+        found = set().union(*(postings[key] for key in _keys(token)), by_initial[token[:1]])
+        bare = token.rstrip(".")
+        if len(bare) == 1:
+            found |= by_first[bare]
+        return found
+
+    pairs = set()
+    for a, item_tokens in enumerate(tokens):
+        matches = {token: _matches(token) for token in set(item_tokens)}
+        # With two or more tokens on both sides a single matched token scores at
+        # most 0.7/2 + 0.3/2 = 0.5, so above that a pair needs two matched
+        # tokens of each item, and one of them is not this item's most common
+        # (non-repeated) token; skipping it keeps "John ..." from pairing with
+        # every John.
+        unique = [token for token in matches if item_tokens.count(token) == 1]
+        if len(item_tokens) > 1 and floor > 0.5 and unique:
+            del matches[max(unique, key=lambda token: len(matches[token]))]
+        for b in set().union(*matches.values()):
+            if owners[a] != owners[b] and not (is_alias[a] and is_alias[b]):
+                i, j = owners[a], owners[b]
+                pairs.add((i, j) if i < j else (j, i))
+    return pairs
 
 
 async def _llm_should_merge(name_a: str, name_b: str, entity_type: str) -> bool:
@@ -459,10 +610,10 @@ async def _llm_should_merge(name_a: str, name_b: str, entity_type: str) -> bool:
     try:
         from app.config import settings
         from app.retry import retry_with_backoff
-        from openai import AsyncOpenAI
+        from app.llm_client import get_llm_client
         import json as _json
         
-        client = AsyncOpenAI(base_url=settings.litellm_url, api_key=settings.litellm_api_key)
+        client = get_llm_client()
         
         prompt = f"""Do these two names refer to the SAME real-world {entity_type.lower()}?
 
@@ -515,6 +666,85 @@ Respond with ONLY: {{"same_entity": true}} or {{"same_entity": false}}"""
 class EntityResolver:
     def __init__(self):
         self._cache = {}
+        # LRU of quantized name embeddings, keyed by normalized lowercase name
+        self._embedding_cache: OrderedDict[str, _QuantizedEmbedding] = OrderedDict()
+        # Names whose embedding came back empty -> when, to avoid retry storms
+        self._embedding_failures: OrderedDict[str, float] = OrderedDict()
+        graph_store.add_discard_listener(self._forget_nodes)
+
+    def _forget_nodes(self, uuids: set[str]):
+        """Drop resolve_generic cache entries for nodes graph_store deleted."""
+        self._cache = {key: node_uuid for key, node_uuid in self._cache.items() if node_uuid not in uuids}
+
+    async def _name_embedding(self, name: str) -> Optional["_QuantizedEmbedding"]:
+        """Embedding for an entity name, generated once and kept int8-quantized."""
+        return (await self._name_embeddings([name]))[0]
+
+    async def _name_embeddings(self, names: list[str]) -> list[Optional["_QuantizedEmbedding"]]:
+        """Batch form of _name_embedding: uncached names are embedded in one request.
+
+        Names that failed within the last EMBEDDING_RETRY_SECONDS are not
+        re-requested and come back as None.
+        """
+        keys = [normalize_name(name).lower() for name in names]
+        now = time.monotonic()
+        missing: dict[str, str] = {}
+        for name, key in zip(names, keys):
+            if key in self._embedding_cache or key in missing:
+                continue
+            failed_at = self._embedding_failures.get(key)
+            if failed_at is not None and now - failed_at < EMBEDDING_RETRY_SECONDS:
+                continue
+            missing[key] = name
+
+        if missing:
+            embeddings = await embeddings_store.generate_embeddings_batch(list(missing.values()))
+            for key, embedding in zip(missing, embeddings):
+                quantized = _quantize_embedding(embedding) if embedding else None
+                if quantized is None:
+                    self._embedding_failures[key] = now
+                    self._embedding_failures.move_to_end(key)
+                else:
+                    self._embedding_failures.pop(key, None)
+                    self._embedding_cache[key] = quantized
+
+        results = []
+        for key in keys:
+            quantized = self._embedding_cache.get(key)
+            if quantized is not None:
+                self._embedding_cache.move_to_end(key)
+            results.append(quantized)
+
+        while len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+            self._embedding_cache.popitem(last=False)
+        while len(self._embedding_failures) > EMBEDDING_CACHE_SIZE:
+            self._embedding_failures.popitem(last=False)
+        return results
+
+    async def prefetch(self, entities: list[dict]):
+        """Batch the exact-match lookups for a document's persons and orgs.
+
+        Normalizes names the way resolve_person/resolve_organization do and
+        seeds graph_store's lookup cache with one query per label, so the
+        per-entity find_* calls that follow don't each round-trip. Purely an
+        optimization: a name normalized differently later just misses.
+        """
+        persons, orgs = [], []
+        for entity in entities:
+            name = _coerce_text(entity.get("name"))
+            entity_type = _coerce_text(entity.get("type")).lower()
+            if not name:
+                continue
+            if entity_type == "person":
+                for part in detect_joint_name(normalize_person_name(name)):
+                    persons.append(normalize_name(part.strip()))
+            elif entity_type == "organization":
+                orgs.append(normalize_name(normalize_org_name(name)))
+        await asyncio.gather(
+            graph_store.prefetch_entity_lookups("Person", persons),
+            graph_store.prefetch_entity_lookups("Organization", orgs),
+        )
+
     async def resolve_person(self, name: str, source_doc_id: int, role: str = None, description: str = None) -> str:
         """Resolve a person name to an existing or new node. Returns uuid."""
         name = _coerce_text(name)
@@ -555,57 +785,60 @@ class EntityResolver:
         # 1. Exact match
         existing = await graph_store.find_person(normalized)
         if existing:
-            if name != existing["name"] and name not in (existing.get("aliases") or []):
-                await graph_store.add_person_alias(existing["uuid"], name)
-            return existing["uuid"]
+            if name != existing.name and name not in existing.aliases:
+                await graph_store.add_person_alias(existing.uuid, name)
+            return existing.uuid
 
-        # 2. Advanced matching against all persons (same-type only: Person↔Person)
-        all_persons = await graph_store.get_all_persons()
+        # 2. Advanced matching against full-text candidates (same-type only: Person↔Person)
+        candidates = await graph_store.search_person_candidates(normalized)
         best_match = None
         best_score = 0.0
 
-        for person in all_persons:
-            score = advanced_match_score(normalized, person["name"] or "", entity_type="Person")
+        for person in candidates:
+            score = advanced_match_score(normalized, person.name, entity_type="Person")
             if score > best_score:
                 best_score = score
                 best_match = person
-            for alias in (person.get("aliases") or []):
+            for alias in person.aliases:
                 alias_score = advanced_match_score(normalized, alias, entity_type="Person")
                 if alias_score > best_score:
                     best_score = alias_score
                     best_match = person
 
         if best_match and best_score >= (LLM_MERGE_LOW / 100.0):
-            if should_auto_merge(normalized, best_match["name"], best_score, "Person"):
-                logger.info(f"Matched '{name}' to '{best_match['name']}' (score={best_score:.3f})")
-                if name != best_match["name"] and name not in (best_match.get("aliases") or []):
-                    await graph_store.add_person_alias(best_match["uuid"], name)
-                return best_match["uuid"]
+            if should_auto_merge(normalized, best_match.name, best_score, "Person"):
+                logger.info(f"Matched '{name}' to '{best_match.name}' (score={best_score:.3f})")
+                if name != best_match.name and name not in best_match.aliases:
+                    await graph_store.add_person_alias(best_match.uuid, name)
+                return best_match.uuid
             elif best_score >= (LLM_MERGE_LOW / 100.0) and best_score < (LLM_MERGE_HIGH / 100.0):
                 # Gray zone — ask LLM
-                if await _llm_should_merge(normalized, best_match["name"], "Person"):
-                    logger.info(f"LLM-confirmed match '{name}' to '{best_match['name']}' (score={best_score:.3f})")
-                    if name != best_match["name"] and name not in (best_match.get("aliases") or []):
-                        await graph_store.add_person_alias(best_match["uuid"], name)
-                    return best_match["uuid"]
+                if await _llm_should_merge(normalized, best_match.name, "Person"):
+                    logger.info(f"LLM-confirmed match '{name}' to '{best_match.name}' (score={best_score:.3f})")
+                    if name != best_match.name and name not in best_match.aliases:
+                        await graph_store.add_person_alias(best_match.uuid, name)
+                    return best_match.uuid
 
         # 3. Embedding similarity
-        if all_persons and best_score >= 0.5:
-            query_emb = await embeddings_store.generate_embedding(normalized)
+        if candidates and best_score >= 0.5:
+            query_emb = await self._name_embedding(normalized)
             if query_emb:
-                for person in all_persons:
-                    if not person.get("name"):
-                        continue
-                    person_emb = await embeddings_store.generate_embedding(person["name"])
-                    if person_emb:
-                        sim = _cosine_similarity(query_emb, person_emb)
+                named = [person for person in candidates if person.name]
+                person_embs = await self._name_embeddings([person.name for person in named])
+                scored = [
+                    (person, emb) for person, emb in zip(named, person_embs)
+                    if emb is not None and emb.values.shape == query_emb.values.shape
+                ]
+                if scored:
+                    sims = _cosine_similarities(query_emb, [emb for _, emb in scored])
+                    for (person, _), sim in zip(scored, sims.tolist()):
                         if sim >= EMBEDDING_THRESHOLD:
                             # Still apply safeguards even for embedding matches
-                            if should_auto_merge(normalized, person["name"], sim, "Person"):
-                                logger.info(f"Embedding matched '{name}' to '{person['name']}' (sim={sim:.3f})")
-                                if name != person["name"]:
-                                    await graph_store.add_person_alias(person["uuid"], name)
-                                return person["uuid"]
+                            if should_auto_merge(normalized, person.name, sim, "Person"):
+                                logger.info(f"Embedding matched '{name}' to '{person.name}' (sim={sim:.3f})")
+                                if name != person.name:
+                                    await graph_store.add_person_alias(person.uuid, name)
+                                return person.uuid
 
         # 4. Create new person
         node_uuid = await graph_store.create_person(
@@ -635,31 +868,31 @@ class EntityResolver:
         # Exact match
         existing = await graph_store.find_organization(normalized)
         if existing:
-            if name != existing["name"] and name not in (existing.get("aliases") or []):
-                await graph_store.add_org_alias(existing["uuid"], name)
-            return existing["uuid"]
+            if name != existing.name and name not in existing.aliases:
+                await graph_store.add_org_alias(existing.uuid, name)
+            return existing.uuid
 
-        # Advanced fuzzy match (same-type only: Organization↔Organization)
-        all_orgs = await graph_store.get_all_organizations()
+        # Advanced fuzzy match against full-text candidates (same-type only: Organization↔Organization)
+        candidates = await graph_store.search_organization_candidates(normalized)
         best_match = None
         best_score = 0.0
 
-        for org in all_orgs:
-            score = advanced_match_score(normalized, org["name"] or "", entity_type="Organization")
+        for org in candidates:
+            score = advanced_match_score(normalized, org.name, entity_type="Organization")
             if score > best_score:
                 best_score = score
                 best_match = org
-            for alias in (org.get("aliases") or []):
+            for alias in org.aliases:
                 alias_score = advanced_match_score(normalized, alias, entity_type="Organization")
                 if alias_score > best_score:
                     best_score = alias_score
                     best_match = org
 
-        if best_match and should_auto_merge(normalized, best_match["name"], best_score, "Organization"):
-            logger.info(f"Fuzzy matched org '{name}' to '{best_match['name']}' (score={best_score:.3f})")
-            if name != best_match["name"] and name not in (best_match.get("aliases") or []):
-                await graph_store.add_org_alias(best_match["uuid"], name)
-            return best_match["uuid"]
+        if best_match and should_auto_merge(normalized, best_match.name, best_score, "Organization"):
+            logger.info(f"Fuzzy matched org '{name}' to '{best_match.name}' (score={best_score:.3f})")
+            if name != best_match.name and name not in best_match.aliases:
+                await graph_store.add_org_alias(best_match.uuid, name)
+            return best_match.uuid
 
         # Create new
         node_uuid = await graph_store.create_organization(
@@ -694,12 +927,13 @@ class EntityResolver:
         if cache_key in self._cache:
             return self._cache[cache_key]
 
-        # Try exact match in Neo4j
-        async with graph_store.driver.session() as session:
-            result = await session.run(
-                f"MATCH (n:{label}) WHERE toLower(toString(n.name)) = toLower($name) RETURN n.uuid AS uuid LIMIT 1",
-                name=name,
-            )
+        # Try exact match in Neo4j (an index seek on name_lc for known labels)
+        if label in UUID_LABELS:
+            match = f"MATCH (n:{label} {{name_lc: toLower($name)}})"
+        else:
+            match = f"MATCH (n:{label}) WHERE toLower(toString(n.name)) = toLower($name)"
+        async with graph_store.driver.session(database=settings.neo4j_database) as session:
+            result = await session.run(f"{match} RETURN n.uuid AS uuid LIMIT 1", name=name)
             record = await result.single()
             if record:
                 uuid = record["uuid"]
@@ -715,6 +949,7 @@ class EntityResolver:
         # Create new entity — use UUID from create_node (it generates its own)
         props = {
             "name": name,
+            "name_lc": name.lower(),
             "source_doc_ids": [source_doc_id],
             "entity_type": entity_type,
         }
@@ -725,171 +960,351 @@ class EntityResolver:
         self._cache[cache_key] = new_uuid
         return new_uuid
 
+    @staticmethod
+    def _candidate_pairs(entities: list[EntityRecord], entity_type: str = "Person",
+                         with_aliases: bool = False) -> list[tuple[int, int, float]]:
+        """Score all entity pairs in bulk and return (i, j, score) for i < j.
+
+        Only pairs whose score reaches LLM_TIEBREAKER_LOW are returned; below
+        that a pair can neither merge nor be reported as skipped. Candidates
+        come from the rapidfuzz scores (with `entity_type`'s scorers) plus the
+        pairs _name_parts_candidates says name parts alone could lift over the
+        floor. Each gets name_parts_match_score folded in, so the score matches
+        advanced_match_score over the same name/alias combinations.
+
+        The upper triangle is swept in blocks of _PAIR_BLOCK_ROWS rows, so
+        memory stays O(block * N) instead of holding the full N x N matrix.
+        """
+        if len(entities) < 2:
+            return []
+        raw_names = [e.name for e in entities]
+        names = [sys.intern(normalize_name(e.name_lc)) for e in entities]
+
+        owners: list[int] = []
+        alias_names: list[str] = []
+        if with_aliases:
+            for idx, entity in enumerate(entities):
+                for alias_lc in entity.aliases_lc:
+                    owners.append(idx)
+                    alias_names.append(sys.intern(normalize_name(alias_lc)))
+        owner_index = np.asarray(owners, dtype=np.int64)
+
+        cutoff = LLM_TIEBREAKER_LOW * 100
+        fuzzy: dict[tuple[int, int], float] = {}
+        for start in range(0, len(names), _PAIR_BLOCK_ROWS):
+            end = min(start + _PAIR_BLOCK_ROWS, len(names))
+            # Row r is entity start + r, column c is entity start + c
+            scores = _score_matrix(names[start:end], names[start:], entity_type, score_cutoff=cutoff)
+
+            if alias_names:
+                # alias-of-i vs name-of-j lands in row i
+                lo, hi = np.searchsorted(owner_index, [start, end])
+                if hi > lo:
+                    block_alias_scores = _score_matrix(alias_names[lo:hi], names[start:], entity_type, score_cutoff=cutoff)
+                    for owner, row in zip(owners[lo:hi], block_alias_scores):
+                        np.maximum(scores[owner - start], row, out=scores[owner - start])
+                # alias-of-j vs name-of-i lands in column j
+                if len(alias_names) > lo:
+                    col_alias_scores = _score_matrix(alias_names[lo:], names[start:end], entity_type, score_cutoff=cutoff)
+                    for owner, col in zip(owners[lo:], col_alias_scores):
+                        np.maximum(scores[:, owner - start], col, out=scores[:, owner - start])
+
+            rows, cols = np.nonzero(np.triu(scores, k=1) >= cutoff)
+            for r, c in zip(rows.tolist(), cols.tolist()):
+                fuzzy[(start + r, start + c)] = float(scores[r, c]) / 100.0
+
+        # Pairs that only name parts can bring to the floor (initials,
+        # abbreviations, a short name inside a much longer one)
+        items, item_owners, item_is_alias = list(raw_names), list(range(len(entities))), [False] * len(entities)
+        if with_aliases:
+            for idx, entity in enumerate(entities):
+                items += entity.aliases
+                item_owners += [idx] * len(entity.aliases)
+                item_is_alias += [True] * len(entity.aliases)
+        for pair in _name_parts_candidates(items, item_owners, item_is_alias, LLM_TIEBREAKER_LOW):
+            fuzzy.setdefault(pair, 0.0)
+
+        pairs = []
+        for (i, j), fuzzy_score in sorted(fuzzy.items()):
+            combos = [(raw_names[i], raw_names[j])]
+            if with_aliases:
+                combos += [(alias, raw_names[j]) for alias in entities[i].aliases]
+                combos += [(raw_names[i], alias) for alias in entities[j].aliases]
+            score = max(fuzzy_score, max(name_parts_match_score(a, b) for a, b in combos))
+            if score >= LLM_TIEBREAKER_LOW:
+                pairs.append((i, j, score))
+        return pairs
+
+    def _plan_merges(self, entities: list[EntityRecord], entity_type: str, report: dict,
+                     with_aliases: bool = False) -> list[tuple[int, list[int], dict[int, float]]]:
+        """Group auto-mergeable entities into clusters with a union-find.
+
+        Returns (keep_index, remove_indices, link_scores) per cluster. The keep
+        node is the earliest entity in the cluster; link_scores holds the best
+        pair score that pulled each member in. Blocked pairs that did not end up
+        in the same cluster are recorded in report["skipped"].
+        """
+        clusters = _UnionFind(len(entities))
+        link_scores: dict[int, float] = {}
+        blocked: list[tuple[int, int, float]] = []
+        # Orgs sharing no distinctive word are always blocked by should_auto_merge;
+        # checking the per-org word sets first skips its other safeguards
+        distinctive = (
+            [get_distinctive_org_words(entity.name) for entity in entities]
+            if entity_type == "Organization" else None
+        )
+
+        # The org dedup has always scored pairs with advanced_match_score's default
+        # (Person) scorers; only the safeguards below look at the real entity_type
+        for i, j, score in self._candidate_pairs(entities, "Person", with_aliases=with_aliases):
+            name_a = entities[i].name
+            name_b = entities[j].name
+            # Most candidates sit in the tiebreaker zone; skip the safeguards for them
+            if score < SIMILARITY_THRESHOLD / 100.0 or (
+                distinctive is not None and distinctive[i].isdisjoint(distinctive[j])
+            ):
+                blocked.append((i, j, score))
+                continue
+            if not should_auto_merge(name_a, name_b, score, entity_type):
+                blocked.append((i, j, score))
+                continue
+            clusters.union(i, j)
+            link_scores[i] = max(link_scores.get(i, 0.0), score)
+            link_scores[j] = max(link_scores.get(j, 0.0), score)
+
+        for i, j, score in blocked:
+            if clusters.find(i) != clusters.find(j):
+                report["skipped"].append({
+                    "a": entities[i].name,
+                    "b": entities[j].name,
+                    "score": round(score, 3),
+                    "reason": "in tiebreaker zone or blocked by safeguard",
+                })
+
+        return [
+            (members[0], members[1:], link_scores)
+            for members in clusters.groups()
+            if len(members) > 1
+        ]
+
     async def resolve_all_entities(self) -> dict:
         """Scan all entities in Neo4j and merge duplicates. Returns a report."""
         report = {"merged_persons": [], "merged_orgs": [], "skipped": [], "errors": []}
 
-        # Resolve persons (same-type only: Person↔Person)
-        all_persons = await graph_store.get_all_persons()
-        merged_uuids = set()
-
-        for i, person_a in enumerate(all_persons):
-            if person_a["uuid"] in merged_uuids:
-                continue
-            for person_b in all_persons[i + 1:]:
-                if person_b["uuid"] in merged_uuids:
-                    continue
-                score = advanced_match_score(
-                    person_a["name"] or "", person_b["name"] or ""
-                )
-                for alias in (person_a.get("aliases") or []):
-                    s = advanced_match_score(alias, person_b["name"] or "")
-                    score = max(score, s)
-                for alias in (person_b.get("aliases") or []):
-                    s = advanced_match_score(person_a["name"] or "", alias)
-                    score = max(score, s)
-
-                if not should_auto_merge(person_a["name"] or "", person_b["name"] or "", score, "Person"):
-                    if score >= (LLM_TIEBREAKER_LOW / 100.0):
-                        report["skipped"].append({
-                            "a": person_a["name"],
-                            "b": person_b["name"],
-                            "score": round(score, 3),
-                            "reason": "in tiebreaker zone or blocked by safeguard",
-                        })
-                    continue
-
-                try:
-                    # Pick canonical name
-                    canonical = pick_canonical_name(person_a["name"] or "", person_b["name"] or "")
-                    await self._merge_nodes(
-                        keep_uuid=person_a["uuid"],
-                        remove_uuid=person_b["uuid"],
-                        remove_name=person_b["name"],
-                        remove_aliases=person_b.get("aliases") or [],
-                        label="Person",
-                        canonical_name=canonical,
-                    )
-                    merged_uuids.add(person_b["uuid"])
-                    report["merged_persons"].append({
-                        "kept": canonical,
-                        "merged": person_b["name"],
-                        "score": round(score, 3),
-                    })
-                    logger.info(
-                        f"Merged Person '{person_b['name']}' into '{person_a['name']}' (score={score:.3f})"
-                    )
-                except Exception as e:
-                    report["errors"].append(f"Failed to merge {person_b['name']} into {person_a['name']}: {e}")
-
+        # Persons and orgs are independent scans, so fetch both at once
+        # (same-type only: Person↔Person, Organization↔Organization).
         # NOTE: Removed cross-type merging (Organization→Person).
         # Entities should only merge within the same type.
+        all_persons, all_orgs = await asyncio.gather(
+            graph_store.get_all_persons(), graph_store.get_all_organizations(),
+        )
+        person_plans = self._plan_merges(all_persons, "Person", report, with_aliases=True)
+        org_plans = self._plan_merges(all_orgs, "Organization", report)
+
+        jobs = [(all_persons, plan, "Person") for plan in person_plans]
+        jobs += [(all_orgs, plan, "Organization") for plan in org_plans]
+        waves = await self._merge_waves([
+            [entities[idx].uuid for idx in remove_idxs] for entities, (_, remove_idxs, _), _ in jobs
+        ])
+
+        # Clusters within a wave share no relationships between removed nodes,
+        # so their merges can overlap commit latency safely.
+        merge_sem = asyncio.Semaphore(MERGE_CONCURRENCY)
+        results: list[Any] = [None] * len(jobs)
+        for wave in waves:
+            wave_results = await asyncio.gather(
+                *[
+                    self._merge_cluster(entities, keep_idx, remove_idxs, label, merge_sem)
+                    for entities, (keep_idx, remove_idxs, _), label in (jobs[job] for job in wave)
+                ],
+                return_exceptions=True,
+            )
+            for job, result in zip(wave, wave_results):
+                results[job] = result
+        person_results, org_results = results[:len(person_plans)], results[len(person_plans):]
+
+        for (keep_idx, remove_idxs, link_scores), result in zip(person_plans, person_results):
+            keep = all_persons[keep_idx]
+            removed = [all_persons[idx] for idx in remove_idxs]
+            if isinstance(result, Exception):
+                names = ", ".join(str(person.name) for person in removed)
+                report["errors"].append(f"Failed to merge {names} into {keep.name}: {result}")
+                continue
+            for idx, person in zip(remove_idxs, removed):
+                report["merged_persons"].append({
+                    "kept": result,
+                    "merged": person.name,
+                    "score": round(link_scores[idx], 3),
+                })
+                logger.info(
+                    f"Merged Person '{person.name}' into '{keep.name}' (score={link_scores[idx]:.3f})"
+                )
 
-        # Merge duplicate orgs (same-type only: Organization↔Organization)
-        all_orgs = await graph_store.get_all_organizations()
-
-        for i, org_a in enumerate(all_orgs):
-            if org_a["uuid"] in merged_uuids:
+        for (keep_idx, remove_idxs, link_scores), result in zip(org_plans, org_results):
+            if isinstance(result, Exception):
+                report["errors"].append(f"Failed to merge org: {result}")
                 continue
-            for org_b in all_orgs[i + 1:]:
-                if org_b["uuid"] in merged_uuids:
-                    continue
-                score = advanced_match_score(org_a["name"] or "", org_b["name"] or "")
-
-                if not should_auto_merge(org_a["name"] or "", org_b["name"] or "", score, "Organization"):
-                    if score >= (LLM_TIEBREAKER_LOW / 100.0):
-                        report["skipped"].append({
-                            "a": org_a["name"],
-                            "b": org_b["name"],
-                            "score": round(score, 3),
-                            "reason": "in tiebreaker zone or blocked by safeguard",
-                        })
-                    continue
-
-                try:
-                    canonical = pick_canonical_name(org_a["name"] or "", org_b["name"] or "")
-                    await self._merge_nodes(
-                        keep_uuid=org_a["uuid"],
-                        remove_uuid=org_b["uuid"],
-                        remove_name=org_b["name"],
-                        remove_aliases=org_b.get("aliases") or [],
-                        label="Organization",
-                        canonical_name=canonical,
-                    )
-                    merged_uuids.add(org_b["uuid"])
-                    report["merged_orgs"].append({
-                        "kept": canonical,
-                        "merged": org_b["name"],
-                        "score": round(score, 3),
-                    })
-                except Exception as e:
-                    report["errors"].append(f"Failed to merge org: {e}")
+            for idx in remove_idxs:
+                report["merged_orgs"].append({
+                    "kept": result,
+                    "merged": all_orgs[idx].name,
+                    "score": round(link_scores[idx], 3),
+                })
 
         report["total_merged"] = len(report["merged_persons"]) + len(report["merged_orgs"])
         report["total_skipped"] = len(report["skipped"])
         return report
 
-    async def _merge_nodes(self, keep_uuid: str, remove_uuid: str,
-                           remove_name: str, remove_aliases: list[str],
-                           label: str, canonical_name: str = None):
-        """Merge remove_uuid node into keep_uuid node in Neo4j."""
-        async with graph_store.driver.session() as session:
-            await session.run(
+    async def _merge_waves(self, removals: list[list[str]]) -> list[list[int]]:
+        """Split clusters into waves whose merges can run concurrently.
+
+        removals holds the uuids each cluster deletes. Two clusters conflict
+        when a relationship links nodes that both delete: each merge would
+        redirect that edge onto a node the other is removing, and one copy is
+        lost. Conflicting clusters land in different waves (greedy coloring).
+        """
+        if len(removals) < 2:
+            return [list(range(len(removals)))] if removals else []
+        owner = {uuid: idx for idx, uuids in enumerate(removals) for uuid in uuids}
+        try:
+            links = await graph_store.execute_read(
                 """
-                MATCH (remove) WHERE remove.uuid = $remove_uuid
-                MATCH (keep) WHERE keep.uuid = $keep_uuid
-                OPTIONAL MATCH (remove)-[r_out]->(target)
-                WHERE target <> keep
-                WITH keep, remove, collect({type: type(r_out), target: target, props: properties(r_out)}) AS out_rels
-                UNWIND out_rels AS rel
-                WITH keep, remove, rel
-                WHERE rel.target IS NOT NULL
-                CALL apoc.create.relationship(keep, rel.type, rel.props, rel.target) YIELD rel AS newRel
-                RETURN count(newRel)
+                MATCH (a:Person|Organization) WHERE a.uuid IN $uuids
+                MATCH (a)--(b) WHERE b.uuid IN $uuids AND a.uuid < b.uuid
+                RETURN DISTINCT a.uuid AS a, b.uuid AS b
                 """,
-                keep_uuid=keep_uuid, remove_uuid=remove_uuid,
+                uuids=list(owner),
             )
-            await session.run(
-                """
-                MATCH (remove) WHERE remove.uuid = $remove_uuid
-                MATCH (keep) WHERE keep.uuid = $keep_uuid
-                OPTIONAL MATCH (source)-[r_in]->(remove)
-                WHERE source <> keep
-                WITH keep, remove, collect({type: type(r_in), source: source, props: properties(r_in)}) AS in_rels
-                UNWIND in_rels AS rel
-                WITH keep, remove, rel
-                WHERE rel.source IS NOT NULL
-                CALL apoc.create.relationship(rel.source, rel.type, rel.props, keep) YIELD rel AS newRel
-                RETURN count(newRel)
+        except Exception as e:
+            logger.warning(f"Merge conflict scan failed, merging clusters one at a time: {e}")
+            return [[idx] for idx in range(len(removals))]
+
+        conflicts: dict[int, set[int]] = {}
+        for link in links:
+            a, b = owner[link["a"]], owner[link["b"]]
+            if a != b:
+                conflicts.setdefault(a, set()).add(b)
+                conflicts.setdefault(b, set()).add(a)
+
+        waves: list[list[int]] = []
+        wave_of: dict[int, int] = {}
+        for idx in range(len(removals)):
+            taken = {wave_of[other] for other in conflicts.get(idx, ()) if other in wave_of}
+            wave = 0
+            while wave in taken:
+                wave += 1
+            if wave == len(waves):
+                waves.append([])
+            waves[wave].append(idx)
+            wave_of[idx] = wave
+        return waves
+
+    async def _merge_cluster(self, entities: list[EntityRecord], keep_idx: int, remove_idxs: list[int],
+                             label: str, sem: asyncio.Semaphore) -> str:
+        """Merge one planned cluster into its keep node. Returns the canonical name."""
+        async with sem:
+            keep = entities[keep_idx]
+            removed = [entities[idx] for idx in remove_idxs]
+            # Pick canonical name across the whole cluster
+            canonical = keep.name
+            for entity in removed:
+                canonical = pick_canonical_name(canonical, entity.name)
+            await self._merge_nodes(
+                keep_uuid=keep.uuid,
+                remove_uuids=[entity.uuid for entity in removed],
+                remove_aliases=[
+                    alias
+                    for entity in removed
+                    for alias in (entity.name, *entity.aliases)
+                ],
+                label=label,
+                canonical_name=canonical,
+            )
+            return canonical
+
+    async def _merge_nodes(self, keep_uuid: str, remove_uuids: list[str],
+                           remove_aliases: list[str], label: str,
+                           canonical_name: str = None):
+        """Merge all remove_uuids nodes into the keep_uuid node in Neo4j.
+
+        remove_aliases should carry the names and aliases of the removed nodes;
+        they are appended to the kept node's aliases.
+        """
+        if label not in UUID_LABELS:
+            raise ValueError(f"Invalid node type: {label}")
+
+        async def _merge(tx):
+            result = await tx.run(
+                f"""
+                MATCH (keep:{label} {{uuid: $keep_uuid}})
+                CALL {{
+                    WITH keep
+                    UNWIND $remove_uuids AS remove_uuid
+                    MATCH (remove:{label} {{uuid: remove_uuid}})-[r_out]->(target)
+                    WHERE target <> keep AND NOT coalesce(target.uuid, '') IN $remove_uuids
+                    CALL apoc.create.relationship(keep, type(r_out), properties(r_out), target) YIELD rel
+                    RETURN count(rel) AS out_count
+                }}
+                CALL {{
+                    WITH keep
+                    UNWIND $remove_uuids AS remove_uuid
+                    MATCH (source)-[r_in]->(remove:{label} {{uuid: remove_uuid}})
+                    WHERE source <> keep AND NOT coalesce(source.uuid, '') IN $remove_uuids
+                    CALL apoc.create.relationship(source, type(r_in), properties(r_in), keep) YIELD rel
+                    RETURN count(rel) AS in_count
+                }}
+                // Append aliases (order-preserving, deduped) and update the canonical name
+                SET keep.aliases = reduce(acc = coalesce(keep.aliases, []), alias IN $aliases |
+                        CASE WHEN alias IN acc THEN acc ELSE acc + alias END),
+                    keep.name = coalesce($name, keep.name)
+                SET keep.name_lc = toLower(toString(keep.name)),
+                    keep.aliases_lc = [a IN keep.aliases | toLower(toString(a))]
+                WITH keep
+                UNWIND $remove_uuids AS remove_uuid
+                MATCH (remove:{label} {{uuid: remove_uuid}})
+                DETACH DELETE remove
                 """,
-                keep_uuid=keep_uuid, remove_uuid=remove_uuid,
+                keep_uuid=keep_uuid,
+                remove_uuids=remove_uuids,
+                aliases=[alias for alias in _coerce_text_list(remove_aliases) if alias],
+                name=_coerce_text(canonical_name) or None,
             )
+            await result.consume()
 
-            all_aliases = [remove_name] + remove_aliases
-            for alias in _coerce_text_list(all_aliases):
-                if alias:
-                    await session.run(
-                        """
-                        MATCH (n) WHERE n.uuid = $uuid
-                        SET n.aliases = CASE
-                            WHEN NOT $alias IN coalesce(n.aliases, []) THEN coalesce(n.aliases, []) + $alias
-                            ELSE coalesce(n.aliases, [])
-                        END
-                        """,
-                        uuid=keep_uuid, alias=alias,
-                    )
+        # One statement in one managed transaction: a single round-trip, and
+        # transient errors (deadlocks with concurrent merges) are retried.
+        async with graph_store.driver.session(database=settings.neo4j_database) as session:
+            await session.execute_write(_merge)
+        graph_store.invalidate_entity_lookups()
 
-            # Update canonical name if provided
-            if canonical_name:
-                await session.run(
-                    "MATCH (n) WHERE n.uuid = $uuid SET n.name = $name",
-                    uuid=keep_uuid, name=_coerce_text(canonical_name),
-                )
 
-            await session.run(
-                "MATCH (n) WHERE n.uuid = $uuid DETACH DELETE n",
-                uuid=remove_uuid,
-            )
+class _UnionFind:
+    """Disjoint-set forest over entity indices (path halving, lowest index as root)."""
+
+    def __init__(self, size: int):
+        self._parent = list(range(size))
+
+    def find(self, idx: int) -> int:
+        parent = self._parent
+        while parent[idx] != idx:
+            parent[idx] = parent[parent[idx]]
+            idx = parent[idx]
+        return idx
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # Keep the lowest index as root so the earliest entity stays canonical
+            if root_b < root_a:
+                root_a, root_b = root_b, root_a
+            self._parent[root_b] = root_a
+
+    def groups(self) -> list[list[int]]:
+        """Members of each set in ascending index order, root first."""
+        members: dict[int, list[int]] = {}
+        for idx in range(len(self._parent)):
+            members.setdefault(self.find(idx), []).append(idx)
+        return list(members.values())
 
 
 def pick_canonical_name(name_a: str, name_b: str) -> str:
@@ -915,8 +1330,7 @@ def pick_canonical_name(name_a: str, name_b: str) -> str:
         # 4. Has middle initial/name
         has_middle = 1 if num_parts >= 3 else 0
         # 5. Prefer names without numbers/special characters
-        import re as _re
-        has_clean_chars = 0 if _re.search(r'[0-9#@&%]', n) else 1
+        has_clean_chars = 0 if _UNCLEAN_NAME_CHARS.search(n) else 1
         return (num_parts, case_score, has_clean_chars, has_middle, length)
     
     score_a = score_name(name_a)
@@ -924,15 +1338,30 @@ def pick_canonical_name(name_a: str, name_b: str) -> str:
     return name_a if score_a >= score_b else name_b
 
 
-def _cosine_similarity(a: list[float], b: list[float]) -> float:
-    if not a or not b or len(a) != len(b):
-        return 0.0
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = sum(x * x for x in a) ** 0.5
-    norm_b = sum(x * x for x in b) ** 0.5
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (norm_a * norm_b)
+class _QuantizedEmbedding(NamedTuple):
+    """Symmetric int8 quantization of an embedding plus the norm of the int8 vector."""
+    values: np.ndarray
+    norm: float
+
+
+def _quantize_embedding(embedding: list[float]) -> Optional[_QuantizedEmbedding]:
+    vector = np.asarray(embedding, dtype=np.float32)
+    peak = float(np.max(np.abs(vector))) if vector.size else 0.0
+    if peak == 0.0:
+        return None
+    values = np.rint(vector * (127.0 / peak)).astype(np.int8)
+    return _QuantizedEmbedding(values, float(np.linalg.norm(values.astype(np.float32))))
+
+
+def _cosine_similarities(query: _QuantizedEmbedding, rows: list[_QuantizedEmbedding]) -> np.ndarray:
+    """Cosine of query against each row as one int8 -> int32 matrix-vector product.
+
+    The per-vector quantization scales cancel out of the cosine, so the int8
+    values and their norms are enough. Rows must match the query's dimension.
+    """
+    matrix = np.stack([row.values for row in rows]).astype(np.int32)
+    norms = np.fromiter((row.norm for row in rows), dtype=np.float64, count=len(rows))
+    return (matrix @ query.values.astype(np.int32)) / (norms * query.norm)
 
 
 entity_resolver = EntityResolver()
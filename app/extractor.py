@@ -1,15 +1,52 @@
+import asyncio
+import copy
+import hashlib
 import json
 import logging
 import re
-from typing import Any
+import string
+import unicodedata
+from typing import Any, Optional
 
-from openai import AsyncOpenAI
+from pydantic import BaseModel, ConfigDict
 
+from app.cache import extraction_cache
 from app.config import settings
+from app.llm_client import RateLimiter, get_llm_client, llm_rate_limiter
 from app.retry import retry_with_backoff
 
 logger = logging.getLogger(__name__)
 
+# Prompt content budgets in characters. Applied after _compact_content, so
+# OCR padding and blank-line runs don't eat into them.
+CONTENT_CHAR_LIMIT = 30000
+RELATIONSHIP_CONTENT_CHAR_LIMIT = 20000  # Leave room for entity list
+
+_SPACE_AROUND_NEWLINE = re.compile(r"[^\S\n]*\n[^\S\n]*")
+_HORIZONTAL_SPACE = re.compile(r"[^\S\n]+")
+_BLANK_LINE_RUN = re.compile(r"\n{3,}")
+
+# Rough completion size charged against the tokens-per-minute budget up front
+COMPLETION_TOKEN_ESTIMATE = 2000
+
+_NON_WORD = re.compile(r"[^\w\s]|_")
+_LEADING_TITLE = re.compile(r"^(?:the|dr) ")
+_NUMERIC_ENTITY = re.compile(r"^\s*\$?\d[\d,.%\s-]*(?:percent)?\s*$", re.I)
+# Only structural numbering: roman numerals and dotted/lettered subsections.
+# Bare "Section 8" (housing) and "Part A"/"Part D" (Medicare) name programs,
+# so like "Chapter 35" they are left to the verifier.
+_SECTION_HEADER = re.compile(r"^\s*(?:section|part)\s+(?:[ivx]+|\d+(?:\.\d+)+|\d+\s*\([a-z0-9]+\))\s*$", re.I)
+
+# Pass 3 only needs enough description to disambiguate an entity
+RELATIONSHIP_DESCRIPTION_CHARS = 80
+
+# Substrings that mark an unlisted relationship endpoint as an organization
+_ORG_NAME_HINTS = re.compile("inc|llc|corp|dept|department|agency|company|bank|university")
+
+# Batch API: how often to poll a submitted job, and give-up states
+BATCH_POLL_SECONDS = 60
+_BATCH_TERMINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
 
 def _coerce_text(value: Any) -> str:
     if value is None:
@@ -515,6 +552,348 @@ Return a JSON object with ONLY the validated entities (remove all junk, correct
 }}}}"""
 
 
+def _compact_content(content: str, max_chars: int = CONTENT_CHAR_LIMIT) -> str:
+    """Collapse OCR whitespace padding: space runs, trailing spaces, 3+ newlines.
+
+    Only a leading window that still yields more than max_chars is processed,
+    widened if padding ate it, so a multi-MB OCR dump costs the event loop
+    the same as a short document. Nothing past max_chars is ever sent.
+    """
+    window = max_chars * 4
+    while True:
+        head = content[:window]
+        compacted = _SPACE_AROUND_NEWLINE.sub("\n", head)
+        compacted = _HORIZONTAL_SPACE.sub(" ", compacted)
+        compacted = _BLANK_LINE_RUN.sub("\n\n", compacted).strip()
+        if len(compacted) > max_chars or len(head) == len(content):
+            return compacted
+        window *= 4
+
+
+def _truncate_content(content: str, max_chars: int) -> str:
+    """Cut to max_chars, backing off to the last word boundary so no token is split."""
+    if len(content) <= max_chars:
+        return content
+    cut = max(content.rfind(" ", 0, max_chars + 1), content.rfind("\n", 0, max_chars + 1))
+    if cut < max_chars * 0.9:
+        cut = max_chars
+    return content[:cut]
+
+
+class _PromptTemplate:
+    """A str.format prompt template parsed once at import.
+
+    Literal text (with {{ }} escapes already resolved) and field names are
+    split up front, so rendering is one join instead of re-scanning a
+    multi-KB template for every document. Only bare {name} fields are
+    supported, which is all the prompts above use.
+    """
+
+    __slots__ = ("_pieces",)
+
+    def __init__(self, template: str):
+        pieces = []
+        for literal, field, spec, conversion in string.Formatter().parse(template):
+            if spec or conversion:
+                raise ValueError(f"Unsupported prompt field: {{{field}!{conversion}:{spec}}}")
+            pieces.append((literal, field))
+        self._pieces = tuple(pieces)
+
+    def format(self, **values: Any) -> str:
+        out = []
+        for literal, field in self._pieces:
+            out.append(literal)
+            if field is not None:
+                out.append(str(values[field]))
+        return "".join(out)
+
+
+class _ChatPrompt:
+    """A pass prompt split into a static system message and a per-document user message.
+
+    Everything before "Document title:" is the same for every document, so it
+    is sent as the system message and forms a stable prefix the provider's
+    prompt cache can reuse; title, content and prior-pass output follow in the
+    user message.
+    """
+
+    __slots__ = ("system", "user", "_system_blocks")
+
+    def __init__(self, template: str):
+        static, marker, variable = template.partition("Document title:")
+        if not marker:
+            raise ValueError("Prompt has no 'Document title:' section")
+        self.system = _PromptTemplate(static).format().rstrip()
+        self.user = _PromptTemplate(marker + variable)
+        # Anthropic only caches up to an explicit breakpoint
+        self._system_blocks = [{"type": "text", "text": self.system, "cache_control": {"type": "ephemeral"}}]
+
+    def messages(self, **values: Any) -> list[dict]:
+        system = self._system_blocks if settings.prompt_cache_control else self.system
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": self.user.format(**values)},
+        ]
+
+
+def _message_chars(messages: list[dict]) -> int:
+    total = 0
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, str):
+            total += len(content)
+        else:
+            total += sum(len(block.get("text", "")) for block in content)
+    return total
+
+
+_METADATA_TEMPLATES = {
+    doc_type: _ChatPrompt(template) for doc_type, template in METADATA_EXTRACTION_PROMPTS.items()
+}
+_GENERIC_METADATA_TEMPLATE = _ChatPrompt(GENERIC_METADATA_PROMPT)
+
+
+def _without_va_rules(template: str) -> str:
+    start = template.index(_VA_RULES_HEADER)
+    end = template.index("Extract all information present.", start)
+    return template[:start] + template[end:]
+
+
+# The military prompt's VA disability-rating rules are ~1 KB that only matter
+# for VA paperwork; documents with no VA/rating vocabulary get the prompt
+# without them.
+_VA_RULES_HEADER = "CRITICAL extraction rules for VA/military documents:"
+_VA_CONTENT = re.compile(
+    r"\b(?:VA|veterans?|disability|disabilities|ratings?|service[- ]connected|CHAMPVA|DEA|chapter 35)\b",
+    re.IGNORECASE,
+)
+_NON_VA_METADATA_TEMPLATES = {
+    "military": _ChatPrompt(_without_va_rules(METADATA_EXTRACTION_PROMPTS["military"])),
+}
+_ENTITY_EXTRACTION_TEMPLATE = _ChatPrompt(ENTITY_EXTRACTION_PROMPT)
+_RELATIONSHIP_EXTRACTION_TEMPLATE = _ChatPrompt(RELATIONSHIP_EXTRACTION_PROMPT)
+_VERIFICATION_TEMPLATE = _ChatPrompt(VERIFICATION_PROMPT)
+
+
+# Single-request prompt: the per-pass instructions above, stitched together so
+# one completion returns metadata, entities and relationships. Built from the
+# same text so the two extraction modes can't drift apart.
+COMBINED_EXTRACTION_PROMPT = """Extract structured metadata, named entities, and the relationships between those entities from this document in a single response.
+
+Return ONE JSON object with exactly these keys:
+{{
+  "metadata": {{ ...object following the METADATA section... }},
+  "entities": [ ...entity objects following the ENTITIES section... ],
+  "relationships": [ ...relationship objects following the RELATIONSHIPS section... ]
+}}
+
+Each section below describes its own JSON shape — put only the inner value under the matching key. In the RELATIONSHIPS section, "the entity list" means the entities you return under "entities".
+
+=== METADATA ===
+{metadata_instructions}
+
+=== ENTITIES ===
+{entity_instructions}
+
+=== RELATIONSHIPS ===
+{relationship_instructions}
+
+=== FINAL CHECK ===
+Before answering, review your "entities" list the way the reviewer below would: drop every entity it would REMOVE and fix wrong types. Return only the entities that pass, and only relationships between them.
+
+{verification_instructions}
+
+Document title: {title}
+Document content:
+{content}"""
+
+
+def _combined_template(metadata_template: _ChatPrompt) -> _ChatPrompt:
+    def _escape(text: str) -> str:
+        return text.replace("{", "{{").replace("}", "}}")
+
+    return _ChatPrompt(COMBINED_EXTRACTION_PROMPT.replace(
+        "{metadata_instructions}", _escape(metadata_template.system),
+    ).replace(
+        "{entity_instructions}", _escape(_ENTITY_EXTRACTION_TEMPLATE.system),
+    ).replace(
+        "{relationship_instructions}", _escape(_RELATIONSHIP_EXTRACTION_TEMPLATE.system),
+    ).replace(
+        "{verification_instructions}", _escape(_VERIFICATION_TEMPLATE.system),
+    ))
+
+
+_COMBINED_TEMPLATES = {
+    doc_type: _combined_template(template) for doc_type, template in _METADATA_TEMPLATES.items()
+}
+_GENERIC_COMBINED_TEMPLATE = _combined_template(_GENERIC_METADATA_TEMPLATE)
+_NON_VA_COMBINED_TEMPLATES = {
+    doc_type: _combined_template(template) for doc_type, template in _NON_VA_METADATA_TEMPLATES.items()
+}
+
+
+def _metadata_template(doc_type: str, content: str) -> _ChatPrompt:
+    if doc_type in _NON_VA_METADATA_TEMPLATES and not _VA_CONTENT.search(content):
+        return _NON_VA_METADATA_TEMPLATES[doc_type]
+    return _METADATA_TEMPLATES.get(doc_type, _GENERIC_METADATA_TEMPLATE)
+
+
+def _combined_prompt(doc_type: str, content: str) -> _ChatPrompt:
+    if doc_type in _NON_VA_COMBINED_TEMPLATES and not _VA_CONTENT.search(content):
+        return _NON_VA_COMBINED_TEMPLATES[doc_type]
+    return _COMBINED_TEMPLATES.get(doc_type, _GENERIC_COMBINED_TEMPLATE)
+
+# Part of the extraction cache key, so editing any prompt invalidates old results
+_PROMPT_FINGERPRINT = hashlib.sha256("\0".join(
+    prompt.system
+    for prompt in (
+        *_METADATA_TEMPLATES.values(), *_COMBINED_TEMPLATES.values(), _GENERIC_METADATA_TEMPLATE,
+        *_NON_VA_METADATA_TEMPLATES.values(), *_NON_VA_COMBINED_TEMPLATES.values(),
+        _GENERIC_COMBINED_TEMPLATE, _ENTITY_EXTRACTION_TEMPLATE, _RELATIONSHIP_EXTRACTION_TEMPLATE,
+        _VERIFICATION_TEMPLATE,
+    )
+).encode("utf-8")).hexdigest()
+
+
+class _StrictModel(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+
+class _Entity(_StrictModel):
+    name: str
+    type: str
+    confidence: float
+    description: str
+
+
+class _EntityList(_StrictModel):
+    entities: list[_Entity]
+
+
+class _Relationship(_StrictModel):
+    from_entity: str
+    to_entity: str
+    relationship_type: str
+    confidence: float
+    description: str
+
+
+class _RelationshipList(_StrictModel):
+    relationships: list[_Relationship]
+
+
+def _json_schema_format(name: str, model: type[BaseModel]) -> dict:
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "strict": True, "schema": model.model_json_schema()},
+    }
+
+
+# Structured-output formats for the passes with a fixed shape. Metadata (and so
+# the combined prompt) is free-form per document type and stays json_object.
+_JSON_OBJECT_FORMAT = {"type": "json_object"}
+_ENTITY_LIST_FORMAT = _json_schema_format("entities", _EntityList)
+_RELATIONSHIP_LIST_FORMAT = _json_schema_format("relationships", _RelationshipList)
+
+
+def _schema_request(schema_format: Optional[dict]) -> dict:
+    """response_format (and vLLM guided-decoding body) for a completion.
+
+    Self-hosted vLLM constrains sampling to the JSON schema itself via
+    guided_json, so every token is on-schema; hosted providers get strict
+    structured outputs when enabled, otherwise plain JSON mode (not every
+    LiteLLM route supports schemas).
+    """
+    if schema_format is None:
+        return {"response_format": _JSON_OBJECT_FORMAT}
+    if settings.llm_backend == "vllm":
+        return {
+            "response_format": _JSON_OBJECT_FORMAT,
+            "extra_body": {"guided_json": schema_format["json_schema"]["schema"]},
+        }
+    if settings.use_strict_schema:
+        return {"response_format": schema_format}
+    return {"response_format": _JSON_OBJECT_FORMAT}
+
+
+def _entity_dedupe_key(entity: dict) -> tuple[str, str]:
+    name = unicodedata.normalize("NFKD", _coerce_text(entity.get("name", ""))).lower()
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    name = " ".join(_NON_WORD.sub(" ", name).split())
+    name = _LEADING_TITLE.sub("", name) or name
+    return name, _coerce_text(entity.get("type", ""))
+
+
+def _drop_local_junk(entity_list: list) -> list:
+    """Drop entities the verifier always removes and a regex can spot: bare
+    amounts/percentages/numbers and section headers."""
+    return [
+        e for e in entity_list
+        if not _NUMERIC_ENTITY.match(_coerce_text(e.get("name", "")))
+        and not _SECTION_HEADER.match(_coerce_text(e.get("name", "")))
+    ]
+
+
+def _confidence(entity: dict) -> float:
+    try:
+        return float(entity.get("confidence", 0.0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _dedupe_entities(entity_list: list) -> tuple[list, dict[str, str]]:
+    """Collapse near-duplicate entities ("Acme Inc.", "ACME, INC") of the same type.
+
+    Keeps the highest-confidence spelling in the position of the first one
+    and returns {dropped name: kept name} so relationships can be remapped.
+    """
+    kept: dict[tuple[str, str], dict] = {}
+    for entity in entity_list:
+        key = _entity_dedupe_key(entity)
+        if not key[0]:
+            continue
+        current = kept.get(key)
+        if current is None or _confidence(entity) > _confidence(current):
+            kept[key] = entity
+
+    deduped = []
+    renamed = {}
+    seen = set()
+    for entity in entity_list:
+        key = _entity_dedupe_key(entity)
+        if not key[0]:
+            continue
+        winner = kept[key]
+        if entity is not winner:
+            name = _coerce_text(entity.get("name", ""))
+            winner_name = _coerce_text(winner.get("name", ""))
+            if name != winner_name:
+                renamed[name] = winner_name
+        if key not in seen:
+            seen.add(key)
+            deduped.append(winner)
+    # A dropped spelling that is still a kept entity's name (other type) stays as is
+    kept_names = {_coerce_text(e.get("name", "")) for e in deduped}
+    return deduped, {name: new for name, new in renamed.items() if name not in kept_names}
+
+
+def _prompt_json(value: Any) -> str:
+    """Serialize prior-pass output for embedding in a prompt.
+
+    Compact separators and raw non-ASCII: indent=2 and \\uXXXX escapes only
+    add whitespace/escape tokens the model pays for and then ignores.
+    """
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+# _repair_json patterns (runs on every completion that isn't clean JSON)
+_FENCE_OPEN = re.compile(r'^```(?:json)?\s*\n?', re.MULTILINE)
+_FENCE_CLOSE = re.compile(r'\n?```\s*$', re.MULTILINE)
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+_FIRST_OBJECT = re.compile(r'\{[\s\S]*\}')
+_FIRST_ARRAY = re.compile(r'\[[\s\S]*\]')
+
+
 def _repair_json(raw_text: str) -> dict:
     """Attempt to parse and repair common JSON issues from LLM output.
     
@@ -539,32 +918,37 @@ def _repair_json(raw_text: str) -> dict:
         pass
     
     # 2. Strip markdown code fences (```json ... ``` or ``` ... ```)
-    text = re.sub(r'^```(?:json)?\s*\n?', '', text, flags=re.MULTILINE)
-    text = re.sub(r'\n?```\s*$', '', text, flags=re.MULTILINE)
-    text = text.strip()
+    # Each repair step only re-parses if it actually changed the text
+    repaired = _FENCE_OPEN.sub('', text)
+    repaired = _FENCE_CLOSE.sub('', repaired)
+    repaired = repaired.strip()
     
-    try:
-        parsed = json.loads(text)
-        if isinstance(parsed, dict):
-            return parsed
-        if isinstance(parsed, list):
-            return {"items": parsed}
-        return {}
-    except json.JSONDecodeError:
-        pass
+    if repaired != text:
+        text = repaired
+        try:
+            parsed = json.loads(text)
+            if isinstance(parsed, dict):
+                return parsed
+            if isinstance(parsed, list):
+                return {"items": parsed}
+            return {}
+        except json.JSONDecodeError:
+            pass
     
     # 3. Fix trailing commas before } or ]
-    text = re.sub(r',\s*([}\]])', r'\1', text)
+    repaired = _TRAILING_COMMA.sub(r'\1', text)
     
-    try:
-        parsed = json.loads(text)
-        if isinstance(parsed, dict):
-            return parsed
-        if isinstance(parsed, list):
-            return {"items": parsed}
-        return {}
-    except json.JSONDecodeError:
-        pass
+    if repaired != text:
+        text = repaired
+        try:
+            parsed = json.loads(text)
+            if isinstance(parsed, dict):
+                return parsed
+            if isinstance(parsed, list):
+                return {"items": parsed}
+            return {}
+        except json.JSONDecodeError:
+            pass
     
     # 4. Try to fix single quotes to double quotes (carefully)
     if '"' not in text and "'" in text:
@@ -579,21 +963,21 @@ def _repair_json(raw_text: str) -> dict:
             pass
     
     # 5. Try extracting the first JSON object from the text
-    match = re.search(r'\{[\s\S]*\}', text)
+    match = _FIRST_OBJECT.search(text)
     if match:
         try:
             candidate = match.group(0)
-            candidate = re.sub(r',\s*([}\]])', r'\1', candidate)
+            candidate = _TRAILING_COMMA.sub(r'\1', candidate)
             return json.loads(candidate)
         except json.JSONDecodeError:
             pass
     
     # 6. Try extracting a JSON array if no object found
-    match = re.search(r'\[[\s\S]*\]', text)
+    match = _FIRST_ARRAY.search(text)
     if match:
         try:
             candidate = match.group(0)
-            candidate = re.sub(r',\s*([}\]])', r'\1', candidate)
+            candidate = _TRAILING_COMMA.sub(r'\1', candidate)
             parsed = json.loads(candidate)
             if isinstance(parsed, list):
                 return {"items": parsed}
@@ -679,23 +1063,212 @@ async def _extract_json_with_retry(call_fn, operation: str, max_retries: int = 3
     return {}
 
 class EntityExtractor:
-    def __init__(self):
-        self.client = AsyncOpenAI(
-            base_url=settings.litellm_url,
-            api_key=settings.litellm_api_key,
-        )
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None):
         self.model = settings.gemini_model
+        self._rate_limiter = rate_limiter or llm_rate_limiter
+
+    @property
+    def client(self):
+        # Looked up per call: close_llm_client() drops the shared client on shutdown
+        return get_llm_client()
+
+    async def _complete_json(self, messages: list[dict], schema_format: Optional[dict] = None) -> dict:
+        """One rate-limited JSON completion; callers wrap it in _extract_json_with_retry."""
+        await self._rate_limiter.acquire(_message_chars(messages) // 4 + COMPLETION_TOKEN_ESTIMATE)
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            **_schema_request(schema_format),
+        )
+        return _repair_json(response.choices[0].message.content)
 
     async def extract(self, title: str, content: str, doc_type: str) -> dict:
+        """Extract metadata, entities and relationships for a document."""
+        content = _compact_content(content)
+        multi_pass = settings.multi_pass_extraction
+        cache_key = self._cache_key(title, content, doc_type, multi_pass)
+        cached = self._cached_result(cache_key)
+        if cached is not None:
+            logger.debug("Extraction cache hit for '%s'", title)
+            return cached
+
+        if multi_pass:
+            result = await self._extract_multi_pass(title, content, doc_type)
+        else:
+            result = await self._extract_combined(title, content, doc_type)
+        self._store_result(cache_key, result)
+        return result
+
+    def _cache_key(self, title: str, content: str, doc_type: str, multi_pass: bool) -> str:
+        """Content-addressed key: same inputs, model, mode and prompts give the same result."""
+        h = hashlib.sha256()
+        for part in (_PROMPT_FINGERPRINT, self.model, str(multi_pass), doc_type, title, content):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _cached_result(self, cache_key: str) -> Optional[dict]:
+        if not settings.enable_extraction_cache:
+            return None
+        cached = extraction_cache.get(cache_key)
+        return copy.deepcopy(cached) if isinstance(cached, dict) else None
+
+    def _store_result(self, cache_key: str, result: dict):
+        # Don't pin a failed extraction (every pass returned {}) for the whole TTL
+        if settings.enable_extraction_cache and result.get("all_entities"):
+            extraction_cache.set(cache_key, result)
+
+    async def _extract_combined(self, title: str, content: str, doc_type: str) -> dict:
+        """Metadata, entities and relationships in one completion, then verification."""
+        prompt_template = _combined_prompt(doc_type, content)
+        messages = prompt_template.messages(title=title, content=_truncate_content(content, CONTENT_CHAR_LIMIT))
+
+        async def _call():
+            return await self._complete_json(messages)
+
+        combined = await _extract_json_with_retry(_call, operation=f"combined_extraction:{doc_type}")
+        return await self._finish_combined(title, combined)
+
+    async def _finish_combined(self, title: str, combined: dict) -> dict:
+        """Validate a combined-extraction response, verify entities and build the result."""
+        metadata = combined.get("metadata")
+        if not isinstance(metadata, dict):
+            metadata = {}
+        entity_list = combined.get("entities")
+        if not isinstance(entity_list, list):
+            entity_list = []
+        entity_list = [e for e in entity_list if isinstance(e, dict)]
+        rel_list = combined.get("relationships")
+        if not isinstance(rel_list, list):
+            rel_list = []
+        rel_list = [r for r in rel_list if isinstance(r, dict)]
+        entity_list, renamed = _dedupe_entities(_drop_local_junk(entity_list))
+        if renamed:
+            for rel in rel_list:
+                for end in ("from_entity", "to_entity"):
+                    name = _coerce_text(rel.get(end, ""))
+                    if name in renamed:
+                        rel[end] = renamed[name]
+        entity_count = len(entity_list)
+        logger.debug("Combined pass extracted %d entities, %d relationships for '%s'", entity_count, len(rel_list), title)
+
+        # The prompt already self-checks against the verification rules; a separate
+        # verification call is only worth it for long lists. Relationships touching
+        # entities it drops go with them.
+        if entity_count >= settings.combined_verification_min_entities:
+            verified_entities = await self._pass4_verification(title, {"entities": entity_list})
+        else:
+            verified_entities = {"entities": entity_list}
+        verified_list = verified_entities.get("entities", [])
+        if len(verified_list) < entity_count:
+            logger.info(f"Pass 4 verification removed {entity_count - len(verified_list)} junk entities for '{title}' ({entity_count} -> {len(verified_list)})")
+            kept = {_coerce_text(e.get("name", "")) for e in verified_list if isinstance(e, dict)}
+            rel_list = [
+                r for r in rel_list
+                if _coerce_text(r.get("from_entity", "")) in kept and _coerce_text(r.get("to_entity", "")) in kept
+            ]
+
+        result = self._combine_results(metadata, verified_entities, {"relationships": rel_list})
+        result["extraction_method"] = "combined"
+        return result
+
+    async def extract_batch(self, docs: list[dict]) -> list[dict]:
+        """Combined extraction for many documents through the provider Batch API.
+
+        For bulk backfills where per-document latency doesn't matter: one JSONL
+        job at batch pricing instead of a completion per document. Each doc is
+        a dict with title, content and doc_type; results come back in the same
+        order. Cached documents are not resubmitted; documents whose batch line
+        failed (or the whole job, if it did) are extracted through the regular
+        path.
+        """
+        results: list[Optional[dict]] = [None] * len(docs)
+        pending: dict[int, tuple[dict, str]] = {}
+        lines = []
+        for i, doc in enumerate(docs):
+            content = _compact_content(doc["content"])
+            cache_key = self._cache_key(doc["title"], content, doc["doc_type"], multi_pass=False)
+            cached = self._cached_result(cache_key)
+            if cached is not None:
+                results[i] = cached
+                continue
+            pending[i] = (doc, cache_key)
+            prompt_template = _combined_prompt(doc["doc_type"], content)
+            lines.append(json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": prompt_template.messages(
+                        title=doc["title"],
+                        content=_truncate_content(content, CONTENT_CHAR_LIMIT),
+                    ),
+                    "response_format": {"type": "json_object"},
+                },
+            }))
+        if not pending:
+            return results
+
+        responses: dict[int, dict] = {}
+        try:
+            upload = await self.client.files.create(
+                file=("extractions.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch",
+            )
+            batch = await self.client.batches.create(
+                input_file_id=upload.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+            )
+            logger.info(f"Submitted extraction batch {batch.id} ({len(pending)} documents, {len(docs) - len(pending)} cached)")
+            while batch.status not in _BATCH_TERMINAL_STATES:
+                await asyncio.sleep(BATCH_POLL_SECONDS)
+                batch = await self.client.batches.retrieve(batch.id)
+
+            if batch.status == "completed" and batch.output_file_id:
+                output = await self.client.files.content(batch.output_file_id)
+                for line in output.text.splitlines():
+                    if not line.strip():
+                        continue
+                    try:
+                        item = json.loads(line)
+                        body = (item.get("response") or {}).get("body") or {}
+                        parsed = _repair_json(body["choices"][0]["message"]["content"])
+                        if isinstance(parsed, dict):
+                            responses[int(item["custom_id"])] = parsed
+                    except (json.JSONDecodeError, KeyError, IndexError, TypeError, ValueError) as e:
+                        logger.warning(f"Batch {batch.id}: unusable result line: {e}")
+            else:
+                logger.warning(f"Extraction batch {batch.id} ended with status {batch.status}")
+        except Exception as e:
+            logger.warning(f"Batch extraction failed: {e} — falling back to per-document extraction")
+
+        missing = sum(1 for i in pending if i not in responses)
+        if missing:
+            logger.info(f"Batch extraction: {missing}/{len(pending)} documents fall back to per-document extraction")
+
+        for i, (doc, cache_key) in pending.items():
+            if i in responses:
+                result = await self._finish_combined(doc["title"], responses[i])
+                self._store_result(cache_key, result)
+            else:
+                result = await self.extract(doc["title"], doc["content"], doc["doc_type"])
+            results[i] = result
+        return results
+
+    async def _extract_multi_pass(self, title: str, content: str, doc_type: str) -> dict:
         """Extract entities and relationships using 4-pass pipeline."""
         # Pass 1: Structured Metadata Extraction
         metadata = await self._pass1_metadata_extraction(title, content, doc_type)
-        logger.debug(f"Pass 1 completed for '{title}' (type: {doc_type})")
+        logger.debug("Pass 1 completed for '%s' (type: %s)", title, doc_type)
         
         # Pass 2: Entity Extraction & Typing
         entities = await self._pass2_entity_extraction(title, content, metadata)
-        entity_count = len(entities.get("entities", []))
-        logger.debug(f"Pass 2 extracted {entity_count} entities for '{title}'")
+        entity_list = [e for e in entities.get("entities", []) if isinstance(e, dict)]
+        entities = {**entities, "entities": _dedupe_entities(_drop_local_junk(entity_list))[0]}
+        entity_count = len(entities["entities"])
+        logger.debug("Pass 2 extracted %d entities for '%s'", entity_count, title)
         
         # Pass 4: Verification (critique & refine) - runs between pass 2 and pass 3
         verified_entities = await self._pass4_verification(title, entities)
@@ -703,10 +1276,14 @@ class EntityExtractor:
         if verified_count < entity_count:
             logger.info(f"Pass 4 verification removed {entity_count - verified_count} junk entities for '{title}' ({entity_count} -> {verified_count})")
         
-        # Pass 3: Relationship Inference (uses verified entities)
-        relationships = await self._pass3_relationship_extraction(title, content, verified_entities)
-        rel_count = len(relationships.get("relationships", []))
-        logger.debug(f"Pass 3 inferred {rel_count} relationships for '{title}'")
+        # Pass 3: Relationship Inference (uses verified entities) - needs two endpoints
+        if verified_count < 2:
+            relationships = {"relationships": []}
+            logger.debug("Pass 3 skipped for '%s' (%d entities)", title, verified_count)
+        else:
+            relationships = await self._pass3_relationship_extraction(title, content, verified_entities)
+            rel_count = len(relationships.get("relationships", []))
+            logger.debug("Pass 3 inferred %d relationships for '%s'", rel_count, title)
         
         # Combine results in format expected by pipeline.py
         result = self._combine_results(metadata, verified_entities, relationships)
@@ -716,57 +1293,46 @@ class EntityExtractor:
 
     async def _pass1_metadata_extraction(self, title: str, content: str, doc_type: str) -> dict:
         """Pass 1: Extract structured metadata specific to document type."""
-        prompt_template = METADATA_EXTRACTION_PROMPTS.get(doc_type, GENERIC_METADATA_PROMPT)
-        truncated = content[:30000]
-        prompt = prompt_template.format(title=title, content=truncated)
+        prompt_template = _metadata_template(doc_type, content)
+        truncated = _truncate_content(content, CONTENT_CHAR_LIMIT)
+        messages = prompt_template.messages(title=title, content=truncated)
 
         async def _call():
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-            )
-            return _repair_json(response.choices[0].message.content)
+            return await self._complete_json(messages)
 
         return await _extract_json_with_retry(_call, operation=f"pass1_metadata:{doc_type}")
 
     async def _pass2_entity_extraction(self, title: str, content: str, metadata: dict) -> dict:
         """Pass 2: Extract and type all entities."""
-        truncated = content[:30000]
-        metadata_str = json.dumps(metadata, indent=2)
-        prompt = ENTITY_EXTRACTION_PROMPT.format(
+        truncated = _truncate_content(content, CONTENT_CHAR_LIMIT)
+        metadata_str = _prompt_json(metadata)
+        messages = _ENTITY_EXTRACTION_TEMPLATE.messages(
             title=title, 
             metadata=metadata_str, 
             content=truncated
         )
 
         async def _call():
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-            )
-            return _repair_json(response.choices[0].message.content)
+            return await self._complete_json(messages, _ENTITY_LIST_FORMAT)
 
         return await _extract_json_with_retry(_call, operation="pass2_entities")
 
     async def _pass3_relationship_extraction(self, title: str, content: str, entities: dict) -> dict:
         """Pass 3: Infer relationships between entities."""
-        truncated = content[:20000]  # Leave room for entity list
-        entities_str = json.dumps(entities.get("entities", []), indent=2)
-        prompt = RELATIONSHIP_EXTRACTION_PROMPT.format(
+        truncated = _truncate_content(content, RELATIONSHIP_CONTENT_CHAR_LIMIT)
+        entities_str = _prompt_json([
+            {**e, "description": _coerce_text(e.get("description", ""))[:RELATIONSHIP_DESCRIPTION_CHARS]}
+            if e.get("description") else e
+            for e in entities.get("entities", [])
+        ])
+        messages = _RELATIONSHIP_EXTRACTION_TEMPLATE.messages(
             title=title,
             entities=entities_str,
             content=truncated
         )
 
         async def _call():
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-            )
-            return _repair_json(response.choices[0].message.content)
+            return await self._complete_json(messages, _RELATIONSHIP_LIST_FORMAT)
 
         return await _extract_json_with_retry(_call, operation="pass3_relationships")
 
@@ -780,19 +1346,14 @@ class EntityExtractor:
         if len(entity_list) <= 3:
             return entities
         
-        entities_str = json.dumps(entity_list, indent=2)
-        prompt = VERIFICATION_PROMPT.format(
+        entities_str = _prompt_json(entity_list)
+        messages = _VERIFICATION_TEMPLATE.messages(
             title=title,
             entities=entities_str,
         )
 
         async def _call():
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-            )
-            return _repair_json(response.choices[0].message.content)
+            return await self._complete_json(messages, _ENTITY_LIST_FORMAT)
 
         try:
             verified = await _extract_json_with_retry(_call, operation="pass4_verification")
@@ -849,6 +1410,7 @@ class EntityExtractor:
             result["organizations"] = organizations
             
         # Convert relationships to implied_relationships format
+        type_by_name = self._entity_types(all_entities)
         implied_relationships = []
         for rel in relationships.get("relationships", []):
             from_entity = _coerce_text(rel.get("from_entity", ""))
@@ -857,8 +1419,8 @@ class EntityExtractor:
                 continue
                 
             # Find entity types from the entities list
-            from_type = self._find_entity_type(from_entity, all_entities)
-            to_type = self._find_entity_type(to_entity, all_entities)
+            from_type = type_by_name.get(from_entity) or self._heuristic_entity_type(from_entity)
+            to_type = type_by_name.get(to_entity) or self._heuristic_entity_type(to_entity)
             
             implied_relationships.append({
                 "from_entity": from_entity,
@@ -884,14 +1446,20 @@ class EntityExtractor:
             
         return result
     
-    def _find_entity_type(self, entity_name: str, entities: list) -> str:
-        """Find the type of an entity from the entities list."""
-        entity_name = _coerce_text(entity_name)
+    @staticmethod
+    def _entity_types(entities: list) -> dict[str, str]:
+        """Name -> type for relationship endpoints; the first entity with a name wins."""
+        type_by_name = {}
         for entity in entities:
-            if _coerce_text(entity.get("name", "")) == entity_name:
-                return _coerce_text(entity.get("type", "Person")) or "Person"
-        # Fallback heuristics
-        if any(w in entity_name.lower() for w in ["inc", "llc", "corp", "dept", "department", "agency", "company", "bank", "university"]):
+            name = _coerce_text(entity.get("name", ""))
+            if name not in type_by_name:
+                type_by_name[name] = _coerce_text(entity.get("type", "Person")) or "Person"
+        return type_by_name
+
+    @staticmethod
+    def _heuristic_entity_type(entity_name: str) -> str:
+        """Fallback type for a relationship endpoint that isn't in the entity list."""
+        if _ORG_NAME_HINTS.search(entity_name.lower()):
             return "Organization"
         return "Person"
 
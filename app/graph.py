@@ -1,71 +1,208 @@
+import asyncio
 import logging
 import re
-import uuid
-from collections import defaultdict
-from typing import Any, Optional
-
-from neo4j import AsyncGraphDatabase
-from rapidfuzz import fuzz
+import sys
+from collections import OrderedDict, defaultdict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Optional
+
+import numpy as np
+from neo4j import AsyncGraphDatabase, RoutingControl
+from rapidfuzz import fuzz, process
 
 from app.config import settings
 from app.retry import retry_db
 
 logger = logging.getLogger(__name__)
 
+# Seconds to establish a bolt connection / before a pooled one is recycled
+NEO4J_CONNECT_TIMEOUT = 5
+NEO4J_MAX_CONNECTION_LIFETIME = 3600
+
+# Lowercased names (and aliases) remembered per label by find_person/find_organization
+ENTITY_LOOKUP_CACHE_SIZE = 4096
+_MISS = object()
+
+# Labels and properties covered by the entity_search full-text index used by
+# search_nodes; other labels fall back to a label scan
+ENTITY_SEARCH_LABELS = (
+    "Document", "Person", "Organization", "Address", "FinancialItem", "MedicalResult",
+    "Contract", "InsurancePolicy", "DateEvent", "DocumentRef", "Condition", "Location",
+    "System", "Event", "Product",
+)
+ENTITY_SEARCH_PROPERTIES = ("name", "title", "aliases", "doc_type", "date", "test_name", "reference_number")
+# Full-text hits re-ranked by term coverage per requested result
+SEARCH_CANDIDATES_PER_RESULT = 5
+
+# Labels with a uuid uniqueness constraint (see GraphStore.init); Document
+# nodes are keyed by paperless_id instead
+UUID_LABELS = (
+    "Person", "Organization", "Address", "FinancialItem", "MedicalResult", "Contract",
+    "InsurancePolicy", "DateEvent", "DocumentRef", "Condition", "Location", "System",
+    "Event", "Product",
+)
+
+# Records per PULL for session reads that stream large, bounded results
+# (the driver default of 1000 splits them into several round-trips)
+BULK_READ_FETCH_SIZE = 10_000
+
+# Rows per page when scanning all persons/organizations
+ENTITY_PAGE_SIZE = 1000
+
+# Nodes get_neighbors expands before stopping (APOC subgraphAll limit)
+NEIGHBOR_NODE_LIMIT = 500
+
+# Rows per UNWIND statement when flushing buffered relationships and aliases
+WRITE_BATCH_SIZE = 1000
+
+# Relationship rows buffered by GraphStore.batch_writes() for the current
+# task (None: write immediately)
+_pending_relationships: ContextVar[Optional[list[dict]]] = ContextVar("pending_relationships", default=None)
+
+# Alias appends buffered by GraphStore.batch_writes(), label -> uuid -> aliases
+_pending_aliases: ContextVar[Optional[dict[str, dict[str, list[str]]]]] = ContextVar("pending_aliases", default=None)
+
+# (label, uuid) of nodes created inside GraphStore.batch_writes(); deleted
+# again if the block or its flush fails
+_created_nodes: ContextVar[Optional[list[tuple[str, str]]]] = ContextVar("created_nodes", default=None)
+
+
+@dataclass(frozen=True, slots=True)
+class EntityRecord:
+    """A Person/Organization row as used by entity resolution.
+
+    Missing names and aliases are normalized once at fetch time, and the
+    lowercased forms are precomputed so hot scoring loops read slots
+    instead of re-deriving them per pair.
+    """
+    uuid: str
+    name: str
+    name_lc: str
+    aliases: tuple[str, ...]
+    aliases_lc: tuple[str, ...]
+    type: Optional[str] = None
+
 
 class GraphStore:
     def __init__(self):
         self.driver = None
+        # Exact-match lookups repeat across documents during ingestion; results
+        # (including "not found") are kept until a write touches that name
+        self._person_lookup: OrderedDict[str, Optional[EntityRecord]] = OrderedDict()
+        self._org_lookup: OrderedDict[str, Optional[EntityRecord]] = OrderedDict()
+        # Lookups in flight per (label, name): concurrent misses for the same
+        # name wait on one query instead of each sending their own
+        self._lookup_inflight: dict[tuple[str, str], asyncio.Future] = {}
+        # Called with the uuids of nodes deleted after a failed batch_writes(),
+        # so caches outside this class can drop them
+        self._discard_listeners: list[Callable[[set[str]], None]] = []
 
     async def init(self):
         self.driver = AsyncGraphDatabase.driver(
             settings.neo4j_uri,
             auth=(settings.neo4j_user, settings.neo4j_password),
+            max_connection_pool_size=settings.neo4j_pool_size,
+            connection_acquisition_timeout=settings.neo4j_acquisition_timeout,
+            connection_timeout=NEO4J_CONNECT_TIMEOUT,
+            keep_alive=True,
+            max_connection_lifetime=NEO4J_MAX_CONNECTION_LIFETIME,
         )
         # Create constraints and indexes
-        async with self.driver.session() as session:
-            constraints = [
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (d:Document) REQUIRE d.paperless_id IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (p:Person) REQUIRE p.uuid IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (o:Organization) REQUIRE o.uuid IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (a:Address) REQUIRE a.uuid IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (f:FinancialItem) REQUIRE f.uuid IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (m:MedicalResult) REQUIRE m.uuid IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (c:Contract) REQUIRE c.uuid IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (i:InsurancePolicy) REQUIRE i.uuid IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (e:DateEvent) REQUIRE e.uuid IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (dr:DocumentRef) REQUIRE dr.uuid IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (cond:Condition) REQUIRE cond.uuid IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (loc:Location) REQUIRE loc.uuid IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (sys:System) REQUIRE sys.uuid IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (ev:Event) REQUIRE ev.uuid IS UNIQUE",
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (prod:Product) REQUIRE prod.uuid IS UNIQUE",
-            ]
-            for c in constraints:
-                try:
-                    await session.run(c)
-                except Exception as e:
-                    logger.warning(f"Constraint creation: {e}")
-            # Indexes for name lookups
-            indexes = [
-                "CREATE INDEX IF NOT EXISTS FOR (p:Person) ON (p.name)",
-                "CREATE INDEX IF NOT EXISTS FOR (o:Organization) ON (o.name)",
-                "CREATE INDEX IF NOT EXISTS FOR (d:Document) ON (d.doc_type)",
-            ]
-            for idx in indexes:
+        constraints = [
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (d:Document) REQUIRE d.paperless_id IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (p:Person) REQUIRE p.uuid IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (o:Organization) REQUIRE o.uuid IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (a:Address) REQUIRE a.uuid IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (f:FinancialItem) REQUIRE f.uuid IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (m:MedicalResult) REQUIRE m.uuid IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (c:Contract) REQUIRE c.uuid IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (i:InsurancePolicy) REQUIRE i.uuid IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (e:DateEvent) REQUIRE e.uuid IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (dr:DocumentRef) REQUIRE dr.uuid IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (cond:Condition) REQUIRE cond.uuid IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (loc:Location) REQUIRE loc.uuid IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (sys:System) REQUIRE sys.uuid IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (ev:Event) REQUIRE ev.uuid IS UNIQUE",
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (prod:Product) REQUIRE prod.uuid IS UNIQUE",
+        ]
+        # Indexes for name lookups
+        indexes = [
+            "CREATE INDEX IF NOT EXISTS FOR (p:Person) ON (p.name)",
+            "CREATE INDEX IF NOT EXISTS FOR (o:Organization) ON (o.name)",
+            # name_lc: lowercased name, looked up by equality (every entity label,
+            # since resolve_generic matches names on the remaining ones)
+            *(f"CREATE INDEX IF NOT EXISTS FOR (n:{label}) ON (n.name_lc)" for label in UUID_LABELS),
+            "CREATE INDEX IF NOT EXISTS FOR (d:Document) ON (d.doc_type)",
+            "CREATE FULLTEXT INDEX person_name_fts IF NOT EXISTS FOR (p:Person) ON EACH [p.name, p.aliases]",
+            "CREATE FULLTEXT INDEX organization_name_fts IF NOT EXISTS FOR (o:Organization) ON EACH [o.name, o.aliases]",
+            (
+                "CREATE FULLTEXT INDEX entity_search IF NOT EXISTS FOR (n:"
+                + "|".join(ENTITY_SEARCH_LABELS)
+                + ") ON EACH ["
+                + ", ".join(f"n.{prop}" for prop in ENTITY_SEARCH_PROPERTIES)
+                + "]"
+            ),
+        ]
+        # Independent IF NOT EXISTS statements: issue them concurrently over the
+        # pool instead of one round-trip after another
+        await asyncio.gather(
+            *(self._run_schema(c, "Constraint") for c in constraints),
+            *(self._run_schema(idx, "Index") for idx in indexes),
+        )
+        async with self.driver.session(database=settings.neo4j_database) as session:
+            # Backfill the lowercased lookup keys on nodes written before they existed
+            for label in UUID_LABELS:
+                aliases_lc = (
+                    ", n.aliases_lc = [a IN coalesce(n.aliases, []) | toLower(toString(a))]"
+                    if label in ("Person", "Organization") else ""
+                )
                 try:
-                    await session.run(idx)
+                    await session.run(
+                        f"""
+                        MATCH (n:{label}) WHERE n.name_lc IS NULL AND n.name IS NOT NULL
+                        SET n.name_lc = toLower(toString(n.name)){aliases_lc}
+                        """
+                    )
                 except Exception as e:
-                    logger.warning(f"Index creation: {e}")
+                    logger.warning(f"Lowercase name backfill for {label}: {e}")
         logger.info("Graph store initialized")
 
+    async def _run_schema(self, statement: str, kind: str):
+        try:
+            await self.driver.execute_query(statement, database_=settings.neo4j_database)
+        except Exception as e:
+            logger.warning(f"{kind} creation: {e}")
+
     async def close(self):
         if self.driver:
             await self.driver.close()
 
-    @staticmethod
-    def new_uuid() -> str:
-        return str(uuid.uuid4())
+    async def execute_read(self, query: str, **params) -> list[dict]:
+        """Run a read-only query via driver.execute_query, routed to readers.
+
+        Uses the driver's managed, pooled session instead of opening one per
+        call, and keeps lookups off the cluster leader.
+        """
+        records, _, _ = await self.driver.execute_query(
+            query,
+            parameters_=params,
+            routing_=RoutingControl.READ,
+            database_=settings.neo4j_database,
+        )
+        return [dict(record) for record in records]
+
+    async def execute_write(self, query: str, **params) -> list[dict]:
+        """Run a single write statement via driver.execute_query on the leader."""
+        records, _, _ = await self.driver.execute_query(
+            query,
+            parameters_=params,
+            routing_=RoutingControl.WRITE,
+            database_=settings.neo4j_database,
+        )
+        return [dict(record) for record in records]
 
     @staticmethod
     def _first_text(value: Any) -> str:
@@ -140,7 +277,7 @@ class GraphStore:
                                     date: str, content_hash: str) -> str:
         """Create or update a Document node. Returns the paperless_id."""
         async def _op():
-            async with self.driver.session() as session:
+            async with self.driver.session(database=settings.neo4j_database) as session:
                 await session.run(
                     """
                     MERGE (d:Document {paperless_id: $pid})
@@ -153,178 +290,645 @@ class GraphStore:
         await retry_db(_op, operation='create_document_node')
         return str(paperless_id)
 
-    async def find_person(self, name: str) -> Optional[dict]:
+    @classmethod
+    def _entity_record(cls, record: dict) -> EntityRecord:
+        # Interned: full scans repeat the same names and aliases many times,
+        # and the resolver keys its caches on them
+        name = sys.intern(cls._coerce_text(record.get("name")))
+        aliases = tuple(sys.intern(alias) for alias in cls._coerce_text_list(record.get("aliases")))
+        return EntityRecord(
+            uuid=record["uuid"],
+            name=name,
+            name_lc=sys.intern(name.lower()),
+            aliases=aliases,
+            aliases_lc=tuple(sys.intern(alias.lower()) for alias in aliases),
+            type=record.get("type"),
+        )
+
+    @staticmethod
+    def _lookup_cached(cache: OrderedDict, key: str):
+        value = cache.get(key, _MISS)
+        if value is not _MISS:
+            cache.move_to_end(key)
+        return value
+
+    @staticmethod
+    def _remember_lookup(cache: OrderedDict, key: str, value: Optional[EntityRecord]):
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > ENTITY_LOOKUP_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    def _remember_entity(self, cache: OrderedDict, record: EntityRecord):
+        for key in (record.name_lc, *record.aliases_lc):
+            if key:
+                self._remember_lookup(cache, key, record)
+
+    def _extend_entity(self, cache: OrderedDict, node_uuid: str, aliases: list[str]):
+        """Apply a committed alias append to the cache in place of a refetch."""
+        record = next((v for v in cache.values() if v is not None and v.uuid == node_uuid), None)
+        if record is None:
+            # Node not cached: only drop "not found" entries for the new aliases
+            for alias in aliases:
+                cache.pop(alias.lower(), None)
+            return
+        added = tuple(alias for alias in dict.fromkeys(aliases) if alias not in record.aliases)
+        self._remember_entity(cache, replace(
+            record,
+            aliases=record.aliases + added,
+            aliases_lc=record.aliases_lc + tuple(alias.lower() for alias in added),
+        ))
+
+    async def _find_entity(self, label: str, cache: OrderedDict, query: str, name: str) -> Optional[EntityRecord]:
+        """Cached exact-name lookup behind find_person/find_organization."""
+        name = self._coerce_text(name)
+        key = name.lower()
+        while True:
+            cached = self._lookup_cached(cache, key)
+            if cached is not _MISS:
+                return cached
+            inflight = self._lookup_inflight.get((label, key))
+            if inflight is None:
+                break
+            # Shielded: a cancelled waiter must not cancel the shared lookup
+            found = await asyncio.shield(inflight)
+            if found is not _MISS:
+                return found
+            # That query failed; try again with our own
+        future = asyncio.get_running_loop().create_future()
+        self._lookup_inflight[(label, key)] = future
+        found = _MISS
+        try:
+            records = await self.execute_read(query, name=name)
+            found = self._entity_record(records[0]) if records else None
+            self._remember_lookup(cache, key, found)
+            return found
+        finally:
+            del self._lookup_inflight[(label, key)]
+            future.set_result(found)
+
+    def invalidate_entity_lookups(self):
+        """Drop cached find_person/find_organization results (after merges/deletes)."""
+        self._person_lookup.clear()
+        self._org_lookup.clear()
+
+    async def find_person(self, name: str) -> Optional[EntityRecord]:
         """Find a person by name or alias."""
-        async with self.driver.session() as session:
-            result = await session.run(
-                """
-                MATCH (p:Person)
-                WHERE toLower(toString(p.name)) = toLower($name)
-                   OR any(a IN coalesce(p.aliases, []) WHERE toLower(toString(a)) = toLower($name))
-                RETURN p.uuid AS uuid, p.name AS name, p.aliases AS aliases
-                LIMIT 1
+        return await self._find_entity(
+            "Person", self._person_lookup,
+            """
+            CALL {
+                MATCH (p:Person {name_lc: toLower($name)}) RETURN p
+                UNION
+                MATCH (p:Person) WHERE toLower($name) IN p.aliases_lc RETURN p
+            }
+            RETURN p.uuid AS uuid, p.name AS name, p.aliases AS aliases
+            LIMIT 1
+            """,
+            name,
+        )
+
+    async def _iter_entities(self, label: str, returns: str,
+                             page_size: int) -> AsyncIterator[EntityRecord]:
+        """Keyset-paged scan of `label` in uuid order (seeks on the uuid constraint)."""
+        cursor = ""
+        while True:
+            records = await self.execute_read(
+                f"""
+                MATCH (n:{label}) WHERE n.uuid > $cursor
+                RETURN {returns}
+                ORDER BY n.uuid
+                LIMIT $page_size
                 """,
-                name=self._coerce_text(name),
+                cursor=cursor, page_size=page_size,
             )
-            record = await result.single()
-            return dict(record) if record else None
+            for record in records:
+                yield self._entity_record(record)
+            if len(records) < page_size:
+                return
+            cursor = records[-1]["uuid"]
+
+    def iter_persons(self, page_size: int = ENTITY_PAGE_SIZE) -> AsyncIterator[EntityRecord]:
+        return self._iter_entities(
+            "Person", "n.uuid AS uuid, n.name AS name, n.aliases AS aliases", page_size,
+        )
 
-    async def get_all_persons(self) -> list[dict]:
-        async with self.driver.session() as session:
-            result = await session.run(
-                "MATCH (p:Person) RETURN p.uuid AS uuid, p.name AS name, p.aliases AS aliases"
-            )
-            return [dict(r) async for r in result]
+    def iter_organizations(self, page_size: int = ENTITY_PAGE_SIZE) -> AsyncIterator[EntityRecord]:
+        return self._iter_entities(
+            "Organization", "n.uuid AS uuid, n.name AS name, n.aliases AS aliases, n.type AS type", page_size,
+        )
 
-    async def get_all_organizations(self) -> list[dict]:
-        async with self.driver.session() as session:
-            result = await session.run(
-                "MATCH (o:Organization) RETURN o.uuid AS uuid, o.name AS name, o.aliases AS aliases, o.type AS type"
-            )
-            return [dict(r) async for r in result]
+    async def prefetch_entity_lookups(self, label: str, names: list[str]):
+        """Resolve many exact names in one round-trip and seed the find_* cache.
 
-    async def find_organization(self, name: str) -> Optional[dict]:
-        async with self.driver.session() as session:
-            result = await session.run(
-                """
-                MATCH (o:Organization)
-                WHERE toLower(toString(o.name)) = toLower($name)
-                   OR any(a IN coalesce(o.aliases, []) WHERE toLower(toString(a)) = toLower($name))
-                RETURN o.uuid AS uuid, o.name AS name, o.aliases AS aliases, o.type AS type
-                LIMIT 1
+        `label` is "Person" or "Organization". Names already cached are
+        skipped; names with no match are cached as not found, exactly as
+        find_person/find_organization would.
+        """
+        cache = self._person_lookup if label == "Person" else self._org_lookup
+        keys = list(dict.fromkeys(
+            key for key in (self._coerce_text(name).lower() for name in names)
+            if key and key not in cache
+        ))
+        if not keys:
+            return
+        records = await self.execute_read(
+            f"""
+            CALL {{
+                MATCH (n:{label}) WHERE n.name_lc IN $keys RETURN n
+                UNION
+                MATCH (n:{label}) WHERE any(a IN coalesce(n.aliases_lc, []) WHERE a IN $keys) RETURN n
+            }}
+            RETURN n.uuid AS uuid, n.name AS name, n.aliases AS aliases, n.type AS type
+            """,
+            keys=keys,
+        )
+        found: dict[str, EntityRecord] = {}
+        for record in map(self._entity_record, records):
+            # Name matches take precedence over alias matches
+            found[record.name_lc] = record
+            for alias in record.aliases_lc:
+                found.setdefault(alias, record)
+        for key in keys:
+            self._remember_lookup(cache, key, found.get(key))
+
+    async def get_all_persons(self) -> list[EntityRecord]:
+        return [person async for person in self.iter_persons()]
+
+    async def get_all_organizations(self) -> list[EntityRecord]:
+        return [org async for org in self.iter_organizations()]
+
+    @staticmethod
+    def _fulltext_query(name: str) -> str:
+        """Build a Lucene query matching any token of `name` by edit distance.
+
+        Single letters (initials) become prefix queries so "B McCarn" still
+        reaches "Blake McCarn". Tokens are Unicode word runs, as the index's
+        standard analyzer splits them ("José Díaz" -> josé, díaz, not
+        jos/d/az), and hold no Lucene syntax characters to escape.
+        """
+        terms = []
+        for token in re.findall(r"\w+", name.lower()):
+            term = f"{token}*" if len(token) == 1 else f"{token}~"
+            if term not in terms:
+                terms.append(term)
+        return " OR ".join(terms)
+
+    async def _fulltext_candidates(self, index: str, name: str, returns: str,
+                                   limit: int) -> Optional[list[EntityRecord]]:
+        query = self._fulltext_query(self._coerce_text(name))
+        if not query:
+            return []
+        try:
+            records = await self.execute_read(
+                f"""
+                CALL db.index.fulltext.queryNodes($index, $query) YIELD node, score
+                RETURN {returns}
+                ORDER BY score DESC
+                LIMIT $limit
                 """,
-                name=self._coerce_text(name),
+                index=index, query=query, limit=limit,
             )
-            record = await result.single()
-            return dict(record) if record else None
+        except Exception as e:
+            logger.warning(f"Full-text candidate search on {index} failed, scanning all nodes: {e}")
+            return None
+        return [self._entity_record(record) for record in records]
+
+    async def search_person_candidates(self, name: str, limit: int = 50) -> list[EntityRecord]:
+        """Top-`limit` persons whose name or aliases resemble `name`.
+
+        Narrows fuzzy resolution to a Lucene-ranked shortlist instead of every
+        Person node; falls back to get_all_persons if the index is unavailable.
+        """
+        candidates = await self._fulltext_candidates(
+            "person_name_fts", name,
+            "node.uuid AS uuid, node.name AS name, node.aliases AS aliases", limit,
+        )
+        if candidates is None:
+            return await self.get_all_persons()
+        return candidates
+
+    async def search_organization_candidates(self, name: str, limit: int = 50) -> list[EntityRecord]:
+        """Organization counterpart of search_person_candidates."""
+        candidates = await self._fulltext_candidates(
+            "organization_name_fts", name,
+            "node.uuid AS uuid, node.name AS name, node.aliases AS aliases, node.type AS type", limit,
+        )
+        if candidates is None:
+            return await self.get_all_organizations()
+        return candidates
+
+    async def find_organization(self, name: str) -> Optional[EntityRecord]:
+        return await self._find_entity(
+            "Organization", self._org_lookup,
+            """
+            CALL {
+                MATCH (o:Organization {name_lc: toLower($name)}) RETURN o
+                UNION
+                MATCH (o:Organization) WHERE toLower($name) IN o.aliases_lc RETURN o
+            }
+            RETURN o.uuid AS uuid, o.name AS name, o.aliases AS aliases, o.type AS type
+            LIMIT 1
+            """,
+            name,
+        )
 
     async def create_person(self, name: str, aliases: list[str] = None, role: str = None,
                             description: str = None) -> str:
-        node_uuid = self.new_uuid()
+        """Create a Person, or return the one that already has this name.
+
+        MERGE on name_lc narrows the window in which two documents resolving
+        the same new name both create it, but there is no uniqueness
+        constraint on name_lc (merges rename nodes, and existing duplicates
+        would block it), so concurrent MERGEs can still race. On a match, new
+        aliases are appended and role/description only fill in blanks.
+        """
         name = self._coerce_text(name)
         aliases = self._coerce_text_list(aliases)
         role = self._coerce_text(role)
         description = self._coerce_text(description)
-        async with self.driver.session() as session:
-            await session.run(
-                """
-                CREATE (p:Person {uuid: $uuid, name: $name, aliases: $aliases, role: $role,
-                                  description: $description, entity_type: 'Person'})
-                """,
-                uuid=node_uuid, name=name, aliases=aliases, role=role,
-                description=description,
-            )
-        return node_uuid
+        records = await self.execute_write(
+            """
+            MERGE (p:Person {name_lc: toLower($name)})
+            ON CREATE SET p.uuid = randomUUID(), p.name = $name, p.aliases = $aliases, p.role = $role,
+                          p.description = $description, p.entity_type = 'Person', p._created = true
+            ON MATCH SET p.aliases = coalesce(p.aliases, []) + [a IN $aliases WHERE NOT a IN coalesce(p.aliases, [])],
+                         p.role = CASE WHEN coalesce(p.role, '') = '' THEN $role ELSE p.role END,
+                         p.description = CASE WHEN coalesce(p.description, '') = '' THEN $description ELSE p.description END
+            SET p.aliases_lc = [a IN p.aliases | toLower(toString(a))]
+            WITH p, p._created IS NOT NULL AS created
+            REMOVE p._created
+            RETURN p.uuid AS uuid, p.name AS name, p.aliases AS aliases, created
+            """,
+            name=name, aliases=aliases, role=role,
+            description=description,
+        )
+        person = self._entity_record(records[0])
+        if records[0]["created"]:
+            self._track_created("Person", [person.uuid])
+        self._remember_entity(self._person_lookup, person)
+        return person.uuid
 
     async def add_person_alias(self, node_uuid: str, alias: str):
-        alias = self._coerce_text(alias)
-        if not alias:
+        await self.add_person_aliases(node_uuid, [alias])
+
+    async def add_person_aliases(self, node_uuid: str, aliases: list[str]):
+        """Append any of `aliases` the node doesn't have yet, in one statement.
+
+        Inside batch_writes() the append is buffered instead.
+        """
+        aliases = self._coerce_text_list(aliases)
+        if not aliases or self._buffer_aliases("Person", self._person_lookup, node_uuid, aliases):
             return
-        async with self.driver.session() as session:
-            await session.run(
-                """
-                MATCH (p:Person {uuid: $uuid})
-                SET p.aliases = CASE
-                    WHEN NOT $alias IN coalesce(p.aliases, []) THEN coalesce(p.aliases, []) + $alias
-                    ELSE coalesce(p.aliases, [])
-                END
-                """,
-                uuid=node_uuid, alias=alias,
-            )
+        await self.add_person_aliases_bulk([{"uuid": node_uuid, "aliases": aliases}])
+
+    async def add_person_aliases_bulk(self, rows: list[dict], tx=None):
+        """add_person_aliases for many nodes: rows of {uuid, aliases}, one UNWIND per batch.
+
+        With `tx`, updating the lookup cache after commit is left to the caller.
+        """
+        rows = self._alias_rows(rows)
+        await self._write_rows(
+            """
+            UNWIND $rows AS row
+            MATCH (p:Person {uuid: row.uuid})
+            WITH p, row, coalesce(p.aliases, []) AS existing
+            SET p.aliases = existing + [a IN row.aliases WHERE NOT a IN existing]
+            SET p.aliases_lc = [a IN p.aliases | toLower(toString(a))]
+            """,
+            rows, tx,
+        )
+        if tx is None:
+            for row in rows:
+                self._extend_entity(self._person_lookup, row["uuid"], row["aliases"])
 
     async def create_organization(self, name: str, org_type: str = None,
                                    aliases: list[str] = None, description: str = None) -> str:
-        node_uuid = self.new_uuid()
+        """Organization counterpart of create_person (MERGE on name_lc, same
+        race caveat); on a match type/description only fill in blanks."""
         name = self._coerce_text(name)
         org_type = self._coerce_text(org_type)
         aliases = self._coerce_text_list(aliases)
         description = self._coerce_text(description)
-        async with self.driver.session() as session:
-            await session.run(
-                """
-                CREATE (o:Organization {uuid: $uuid, name: $name, type: $type, aliases: $aliases,
-                                        description: $description, entity_type: 'Organization'})
-                """,
-                uuid=node_uuid, name=name, type=org_type, aliases=aliases,
-                description=description,
-            )
-        return node_uuid
+        records = await self.execute_write(
+            """
+            MERGE (o:Organization {name_lc: toLower($name)})
+            ON CREATE SET o.uuid = randomUUID(), o.name = $name, o.type = $type, o.aliases = $aliases,
+                          o.description = $description, o.entity_type = 'Organization', o._created = true
+            ON MATCH SET o.aliases = coalesce(o.aliases, []) + [a IN $aliases WHERE NOT a IN coalesce(o.aliases, [])],
+                         o.type = CASE WHEN coalesce(o.type, '') = '' THEN $type ELSE o.type END,
+                         o.description = CASE WHEN coalesce(o.description, '') = '' THEN $description ELSE o.description END
+            SET o.aliases_lc = [a IN o.aliases | toLower(toString(a))]
+            WITH o, o._created IS NOT NULL AS created
+            REMOVE o._created
+            RETURN o.uuid AS uuid, o.name AS name, o.aliases AS aliases, o.type AS type, created
+            """,
+            name=name, type=org_type, aliases=aliases,
+            description=description,
+        )
+        org = self._entity_record(records[0])
+        if records[0]["created"]:
+            self._track_created("Organization", [org.uuid])
+        self._remember_entity(self._org_lookup, org)
+        return org.uuid
 
     async def add_org_alias(self, node_uuid: str, alias: str):
-        alias = self._coerce_text(alias)
-        if not alias:
+        await self.add_org_aliases(node_uuid, [alias])
+
+    async def add_org_aliases(self, node_uuid: str, aliases: list[str]):
+        """Append any of `aliases` the node doesn't have yet, in one statement.
+
+        Inside batch_writes() the append is buffered instead.
+        """
+        aliases = self._coerce_text_list(aliases)
+        if not aliases or self._buffer_aliases("Organization", self._org_lookup, node_uuid, aliases):
             return
-        async with self.driver.session() as session:
-            await session.run(
-                """
-                MATCH (o:Organization {uuid: $uuid})
-                SET o.aliases = CASE
-                    WHEN NOT $alias IN coalesce(o.aliases, []) THEN coalesce(o.aliases, []) + $alias
-                    ELSE coalesce(o.aliases, [])
-                END
-                """,
-                uuid=node_uuid, alias=alias,
-            )
+        await self.add_org_aliases_bulk([{"uuid": node_uuid, "aliases": aliases}])
+
+    async def add_org_aliases_bulk(self, rows: list[dict], tx=None):
+        """add_org_aliases for many nodes: rows of {uuid, aliases}, one UNWIND per batch.
+
+        With `tx`, updating the lookup cache after commit is left to the caller.
+        """
+        rows = self._alias_rows(rows)
+        await self._write_rows(
+            """
+            UNWIND $rows AS row
+            MATCH (o:Organization {uuid: row.uuid})
+            WITH o, row, coalesce(o.aliases, []) AS existing
+            SET o.aliases = existing + [a IN row.aliases WHERE NOT a IN existing]
+            SET o.aliases_lc = [a IN o.aliases | toLower(toString(a))]
+            """,
+            rows, tx,
+        )
+        if tx is None:
+            for row in rows:
+                self._extend_entity(self._org_lookup, row["uuid"], row["aliases"])
+
+    @classmethod
+    def _alias_rows(cls, rows: list[dict]) -> list[dict]:
+        # One row per node with its aliases deduped in order, so the UNWIND
+        # never appends the same alias twice
+        merged: dict[str, dict[str, None]] = {}
+        for row in rows:
+            for alias in cls._coerce_text_list(row.get("aliases")):
+                merged.setdefault(row["uuid"], {})[alias] = None
+        return [{"uuid": node_uuid, "aliases": list(aliases)} for node_uuid, aliases in merged.items()]
+
+    @staticmethod
+    def _buffer_aliases(label: str, cache: OrderedDict, node_uuid: str, aliases: list[str]) -> bool:
+        pending = _pending_aliases.get()
+        if pending is None:
+            return False
+        pending.setdefault(label, {}).setdefault(node_uuid, []).extend(aliases)
+        # A cached miss for the new alias would hide the node until the flush
+        for alias in aliases:
+            cache.pop(alias.lower(), None)
+        return True
 
     async def create_node(self, label: str, properties: dict) -> str:
         """Create a generic node with given label and properties."""
-        node_uuid = self.new_uuid()
-        properties = self._sanitize_identity_properties(properties)
-        props = {**properties, "uuid": node_uuid}
-        props_str = ", ".join(f"{k}: ${k}" for k in props)
-        query = f"CREATE (n:{label} {{{props_str}}})"
+        props = self._sanitize_identity_properties(properties)
+        # Properties go in as one map parameter, so the query text (and its
+        # cached plan) depends only on the label, not on the property keys.
+        # Only known labels are spliced into Cypher; anything else is passed
+        # as a parameter through APOC. The uuid is generated server-side
+        # unless the caller supplied one.
+        if label in UUID_LABELS:
+            query = f"CREATE (n:{label}) SET n = $props SET n.uuid = coalesce(n.uuid, randomUUID()) RETURN n.uuid AS uuid"
+        else:
+            query = """
+                CALL apoc.create.node([$label], $props) YIELD node
+                SET node.uuid = coalesce(node.uuid, randomUUID())
+                RETURN node.uuid AS uuid
+            """
         async def _op():
-            async with self.driver.session() as session:
-                await session.run(query, **props)
-        await retry_db(_op, operation='create_node')
+            async with self.driver.session(database=settings.neo4j_database) as session:
+                result = await session.run(query, label=label, props=props)
+                record = await result.single()
+                return record["uuid"]
+        node_uuid = await retry_db(_op, operation='create_node')
+        self._track_created(label, [node_uuid])
         return node_uuid
 
+    async def create_nodes(self, label: str, properties_list: list[dict]) -> list[str]:
+        """create_node for many nodes of one label, one UNWIND per batch.
+
+        Returns the new uuids in the order of `properties_list`.
+        """
+        rows = [self._sanitize_identity_properties(properties) for properties in properties_list]
+        if label in UUID_LABELS:
+            query = f"""
+                UNWIND range(0, size($rows) - 1) AS i
+                CREATE (n:{label}) SET n = $rows[i]
+                SET n.uuid = coalesce(n.uuid, randomUUID())
+                RETURN i, n.uuid AS uuid
+            """
+        else:
+            query = """
+                UNWIND range(0, size($rows) - 1) AS i
+                CALL apoc.create.node([$label], $rows[i]) YIELD node
+                SET node.uuid = coalesce(node.uuid, randomUUID())
+                RETURN i, node.uuid AS uuid
+            """
+        uuids = []
+        for start in range(0, len(rows), WRITE_BATCH_SIZE):
+            records = await self.execute_write(query, label=label, rows=rows[start:start + WRITE_BATCH_SIZE])
+            uuids.extend(record["uuid"] for record in sorted(records, key=lambda record: record["i"]))
+        self._track_created(label, uuids)
+        return uuids
+
+    @staticmethod
+    def _track_created(label: str, uuids: list[str]):
+        created = _created_nodes.get()
+        if created is not None:
+            created.extend((label, node_uuid) for node_uuid in uuids)
+
     async def create_relationship(self, from_uuid: str, from_label: str,
                                    to_uuid: str, to_label: str,
                                    rel_type: str, properties: dict = None):
-        """Create a relationship between two nodes. Increments weight on duplicate."""
-        props = properties or {}
-        # Sanitize relationship type for Neo4j compatibility
-        rel_type = _sanitize_rel_type(rel_type)
-        # Use MERGE to avoid duplicates and track weight
-        query = f"""
-            MATCH (a) WHERE a.uuid = $from_uuid OR a.paperless_id = $from_pid
-            MATCH (b) WHERE b.uuid = $to_uuid OR b.paperless_id = $to_pid
-            MERGE (a)-[r:{rel_type}]->(b)
-            ON CREATE SET r = $props, r.weight = 1
-            ON MATCH SET r.weight = coalesce(r.weight, 1) + 1, r += $props
+        """Create a relationship between two nodes. Increments weight on duplicate.
+
+        Inside batch_writes() the write is buffered instead.
         """
-        async def _op():
-            async with self.driver.session() as session:
-                await session.run(
-                    query,
-                    from_uuid=from_uuid, from_pid=_try_int(from_uuid),
-                    to_uuid=to_uuid, to_pid=_try_int(to_uuid),
-                    props=props,
+        row = {
+            "from_uuid": from_uuid, "from_label": from_label,
+            "to_uuid": to_uuid, "to_label": to_label,
+            "rel_type": rel_type, "props": properties or {},
+        }
+        pending = _pending_relationships.get()
+        if pending is not None:
+            pending.append(row)
+            return
+        await self.create_relationships_batch([row])
+
+    async def create_relationships_batch(self, rows: list[dict], tx=None):
+        """Write many relationships with one UNWIND query per relationship type
+        and label pair.
+
+        Rows take create_relationship's arguments: from_uuid, from_label,
+        to_uuid, to_label, rel_type and optional props. Same MERGE/weight
+        semantics, so a pair repeated within the batch counts once per row.
+        Each side is matched under its given label; rows that find nothing
+        there (a Person-resolved name can come back as an Organization) are
+        retried against every label.
+        """
+        groups: dict[tuple, list[dict]] = defaultdict(list)
+        for i, row in enumerate(rows):
+            from_pid, to_pid = _try_int(row["from_uuid"]), _try_int(row["to_uuid"])
+            key = (
+                _id_label(from_pid, row.get("from_label")),
+                _id_label(to_pid, row.get("to_label")),
+                _sanitize_rel_type(row["rel_type"]),
+            )
+            groups[key].append({
+                "i": i,
+                "from_uuid": row["from_uuid"], "from_pid": from_pid,
+                "to_uuid": row["to_uuid"], "to_pid": to_pid,
+                "props": row.get("props") or {},
+            })
+        retry: dict[tuple, list[dict]] = defaultdict(list)
+        for (from_label, to_label, rel_type), group in groups.items():
+            records = await self._write_rows(_relationship_query(from_label, to_label, rel_type), group, tx)
+            if from_label in UUID_LABELS or to_label in UUID_LABELS:
+                linked = {record["i"] for record in records}
+                unlinked = [row for row in group if row["i"] not in linked]
+                if unlinked:
+                    key = (
+                        "Document" if from_label == "Document" else None,
+                        "Document" if to_label == "Document" else None,
+                        rel_type,
+                    )
+                    retry[key].extend(unlinked)
+        for (from_label, to_label, rel_type), group in retry.items():
+            await self._write_rows(_relationship_query(from_label, to_label, rel_type), group, tx)
+
+    async def _write_rows(self, query: str, rows: list[dict], tx=None) -> list[dict]:
+        """Run an UNWIND $rows write in WRITE_BATCH_SIZE chunks, inside `tx`
+        when given, otherwise as one auto-committed statement per chunk.
+        Returns the records of all chunks."""
+        records = []
+        for start in range(0, len(rows), WRITE_BATCH_SIZE):
+            chunk = rows[start:start + WRITE_BATCH_SIZE]
+            if tx is None:
+                records.extend(await self.execute_write(query, rows=chunk))
+            else:
+                result = await tx.run(query, rows=chunk)
+                records.extend(await result.data())
+        return records
+
+    @asynccontextmanager
+    async def batch_writes(self):
+        """Buffer create_relationship and alias-append calls made in this
+        block (and the tasks it spawns) and write them on exit with one
+        UNWIND per relationship type / label, all in one transaction.
+
+        Nodes are still created immediately, since resolution looks them up
+        by name as it goes. If the block or the flush raises, nothing
+        buffered is written and the nodes created in the block are deleted
+        again (those no other write has linked to in the meantime): without
+        their relationships no document's cleanup would ever reach them.
+        """
+        rows: list[dict] = []
+        aliases: dict[str, dict[str, list[str]]] = {}
+        created: list[tuple[str, str]] = []
+        rel_token = _pending_relationships.set(rows)
+        alias_token = _pending_aliases.set(aliases)
+        created_token = _created_nodes.set(created)
+        try:
+            try:
+                yield
+            finally:
+                _pending_relationships.reset(rel_token)
+                _pending_aliases.reset(alias_token)
+                _created_nodes.reset(created_token)
+            if rows or aliases:
+                await self._flush_batch(rows, aliases)
+        except BaseException:
+            # BaseException: a cancelled block leaves the same orphans behind
+            if created:
+                await self._discard_created_nodes(created)
+            raise
+
+    async def _flush_batch(self, rows: list[dict], aliases: dict[str, dict[str, list[str]]]):
+        """Write what batch_writes() buffered in one transaction."""
+        async def _flush(tx):
+            if "Person" in aliases:
+                await self.add_person_aliases_bulk(
+                    [{"uuid": u, "aliases": a} for u, a in aliases["Person"].items()], tx=tx)
+            if "Organization" in aliases:
+                await self.add_org_aliases_bulk(
+                    [{"uuid": u, "aliases": a} for u, a in aliases["Organization"].items()], tx=tx)
+            await self.create_relationships_batch(rows, tx=tx)
+
+        async with self.driver.session(database=settings.neo4j_database) as session:
+            await session.execute_write(_flush)
+        # The cache only learns the aliases once they are committed
+        for label, cache in (("Person", self._person_lookup), ("Organization", self._org_lookup)):
+            for node_uuid, node_aliases in aliases.get(label, {}).items():
+                self._extend_entity(cache, node_uuid, node_aliases)
+
+    async def _discard_created_nodes(self, created: list[tuple[str, str]]):
+        """Delete nodes created in a failed batch_writes() block that are still
+        unlinked, and drop them from the lookup caches. Failures are only logged,
+        so the block's own exception propagates."""
+        by_label: dict[str, list[str]] = defaultdict(list)
+        for label, node_uuid in created:
+            by_label[label].append(node_uuid)
+        discarded: set[str] = set()
+        try:
+            for label, uuids in by_label.items():
+                if label in UUID_LABELS:
+                    match = f"MATCH (n:{label} {{uuid: node_uuid}})"
+                else:
+                    # Labels outside UUID_LABELS (created through APOC) are not spliced in
+                    match = "MATCH (n {uuid: node_uuid}) WHERE $label IN labels(n)"
+                records = await self.execute_write(
+                    f"""
+                    UNWIND $uuids AS node_uuid
+                    {match}
+                    WITH n, node_uuid WHERE NOT EXISTS {{ (n)--() }}
+                    DELETE n
+                    RETURN node_uuid
+                    """,
+                    uuids=uuids, label=label,
                 )
-        await retry_db(_op, operation='create_relationship')
+                discarded.update(record["node_uuid"] for record in records)
+        except Exception as e:
+            logger.warning(f"Failed to delete {len(created)} nodes created in a failed batch: {e}")
+        if not discarded:
+            return
+        logger.info(f"Deleted {len(discarded)} unlinked nodes created in a failed batch")
+        for cache in (self._person_lookup, self._org_lookup):
+            for key in [key for key, record in cache.items() if record is not None and record.uuid in discarded]:
+                del cache[key]
+        for listener in self._discard_listeners:
+            listener(discarded)
+
+    def add_discard_listener(self, listener: Callable[[set[str]], None]):
+        """Register a callback for the uuids of nodes deleted after a failed batch_writes()."""
+        self._discard_listeners.append(listener)
 
     async def get_document_entities(self, paperless_id: int) -> list[dict]:
         """Get all entities connected to a document."""
-        async with self.driver.session() as session:
-            result = await session.run(
-                """
-                MATCH (d:Document {paperless_id: $pid})-[r]-(n)
-                WHERE NOT n:Document
-                RETURN DISTINCT labels(n) AS labels, properties(n) AS props, n.uuid AS uuid
-                """,
-                pid=paperless_id,
-            )
-            entities = []
-            async for r in result:
-                entity = {"labels": r["labels"], "uuid": r["uuid"]}
-                entity.update(r["props"])
-                entities.append(entity)
-            return entities
+        records = await self.execute_read(
+            """
+            MATCH (d:Document {paperless_id: $pid})-[r]-(n)
+            WHERE NOT n:Document
+            RETURN DISTINCT labels(n) AS labels, properties(n) AS props, n.uuid AS uuid
+            """,
+            pid=paperless_id,
+        )
+        entities = []
+        for r in records:
+            entity = {"labels": r["labels"], "uuid": r["uuid"]}
+            entity.update(r["props"])
+            entities.append(entity)
+        return entities
 
     async def get_document_detail_graph(self, paperless_id: int) -> dict:
         """Return a document node with extracted entities and relationships."""
-        async with self.driver.session() as session:
+        async with self.driver.session(database=settings.neo4j_database) as session:
             result = await session.run(
                 """
                 MATCH (d:Document {paperless_id: $pid})
@@ -363,7 +967,7 @@ class GraphStore:
         if not entity_uuids:
             return {"nodes": [], "relationships": []}
 
-        async with self.driver.session() as session:
+        async with self.driver.session(database=settings.neo4j_database) as session:
             result = await session.run(
                 """
                 MATCH (n) WHERE n.uuid IN $uuids
@@ -377,8 +981,8 @@ class GraphStore:
                 UNWIND all_rels AS r2
                 RETURN nodes,
                        collect(DISTINCT {type: type(r2), props: properties(r2),
-                               start_uuid: coalesce(properties(startNode(r2)).uuid, toString(startNode(r2).paperless_id)),
-                               end_uuid: coalesce(properties(endNode(r2)).uuid, toString(endNode(r2).paperless_id)),
+                               start_uuid: coalesce(startNode(r2).uuid, toString(startNode(r2).paperless_id)),
+                               end_uuid: coalesce(endNode(r2).uuid, toString(endNode(r2).paperless_id)),
                                weight: r2.weight}) AS relationships
                 """,
                 uuids=entity_uuids, depth=depth,
@@ -390,18 +994,18 @@ class GraphStore:
 
     async def _get_subgraph_no_apoc(self, entity_uuids: list[str], depth: int) -> dict:
         """Fallback subgraph query without APOC."""
-        async with self.driver.session() as session:
+        async with self.driver.session(database=settings.neo4j_database) as session:
             result = await session.run(
-                """
-                MATCH path = (start)-[*1..3]-(end)
+                f"""
+                MATCH path = (start)-[*1..{_path_depth(depth)}]-(end)
                 WHERE start.uuid IN $uuids
                 UNWIND nodes(path) AS n
                 UNWIND relationships(path) AS r
-                WITH collect(DISTINCT {labels: labels(n), props: properties(n)}) AS nodes,
-                     collect(DISTINCT {type: type(r), props: properties(r),
-                             start_uuid: coalesce(properties(startNode(r)).uuid, toString(startNode(r).paperless_id)),
-                             end_uuid: coalesce(properties(endNode(r)).uuid, toString(endNode(r).paperless_id)),
-                             weight: r.weight}) AS rels
+                WITH collect(DISTINCT {{labels: labels(n), props: properties(n)}}) AS nodes,
+                     collect(DISTINCT {{type: type(r), props: properties(r),
+                             start_uuid: coalesce(startNode(r).uuid, toString(startNode(r).paperless_id)),
+                             end_uuid: coalesce(endNode(r).uuid, toString(endNode(r).paperless_id)),
+                             weight: r.weight}}) AS rels
                 RETURN nodes, rels
                 """,
                 uuids=entity_uuids,
@@ -416,7 +1020,7 @@ class GraphStore:
         """Get documents connected to entities of specific types, grouped by entity type.
         Returns {entity_type: [{paperless_id, title, entity_name, relationship}, ...]}"""
         results = {}
-        async with self.driver.session() as session:
+        async with self.driver.session(database=settings.neo4j_database) as session:
             for etype in entity_types:
                 query = """
                 MATCH (d:Document)-[r]-(e)
@@ -434,63 +1038,95 @@ class GraphStore:
 
     async def get_all_document_ids(self) -> set[int]:
         """Return all paperless_id values for Document nodes in the graph."""
-        async with self.driver.session() as session:
-            result = await session.run(
-                "MATCH (d:Document) WHERE d.paperless_id IS NOT NULL RETURN d.paperless_id AS pid"
-            )
-            records = await result.data()
-            return {r["pid"] for r in records}
+        records = await self.execute_read(
+            "MATCH (d:Document) WHERE d.paperless_id IS NOT NULL RETURN d.paperless_id AS pid"
+        )
+        return {r["pid"] for r in records}
 
     async def delete_document_graph(self, paperless_id: int):
         """Remove all nodes and relationships sourced from a document."""
-        async with self.driver.session() as session:
+        async def _delete(tx) -> int:
             # Delete relationships with source_doc
-            await session.run(
+            result = await tx.run(
                 """
-                MATCH ()-[r]->()
+                MATCH (a)-[r]->(b)
                 WHERE r.source_doc = $pid
+                WITH r, elementId(a) AS a_id, elementId(b) AS b_id
                 DELETE r
+                RETURN collect(a_id) + collect(b_id) AS ids
                 """,
                 pid=paperless_id,
             )
+            record = await result.single()
+            touched = set(record["ids"]) if record else set()
             # Delete the document node
-            await session.run(
-                "MATCH (d:Document {paperless_id: $pid}) DETACH DELETE d",
+            result = await tx.run(
+                """
+                MATCH (d:Document {paperless_id: $pid})
+                OPTIONAL MATCH (d)--(n)
+                WITH d, collect(elementId(n)) AS ids
+                DETACH DELETE d
+                RETURN ids
+                """,
                 pid=paperless_id,
             )
-            # Clean up orphan nodes (no relationships)
-            await session.run(
+            record = await result.single()
+            if record:
+                touched.update(record["ids"])
+            if not touched:
+                return 0
+            # Clean up nodes this document left orphaned. Scoped to what it
+            # touched: a graph-wide sweep would also delete nodes that other
+            # documents in flight have created but not yet linked (their
+            # relationships are written in one batch at the end).
+            result = await tx.run(
                 """
                 MATCH (n)
-                WHERE NOT n:Document AND NOT EXISTS { (n)--() }
+                WHERE elementId(n) IN $ids AND NOT n:Document AND NOT EXISTS { (n)--() }
+                WITH n, n:Person OR n:Organization AS is_entity
                 DELETE n
-                """
+                RETURN count(CASE WHEN is_entity THEN 1 END) AS entities
+                """,
+                ids=list(touched),
             )
+            record = await result.single()
+            return record["entities"] if record else 0
+
+        # One managed transaction: the document is never left half-deleted,
+        # and transient errors retry the whole unit
+        async with self.driver.session(database=settings.neo4j_database) as session:
+            deleted_entities = await session.execute_write(_delete)
+        if deleted_entities:
+            self.invalidate_entity_lookups()
 
     async def clear_all(self):
-        async with self.driver.session() as session:
+        async with self.driver.session(database=settings.neo4j_database) as session:
             await session.run("MATCH (n) DETACH DELETE n")
+        self.invalidate_entity_lookups()
 
     async def get_counts(self) -> dict:
-        async with self.driver.session() as session:
-            node_result = await session.run("MATCH (n) RETURN count(n) AS count")
-            node_record = await node_result.single()
-            rel_result = await session.run("MATCH ()-[r]->() RETURN count(r) AS count")
-            rel_record = await rel_result.single()
-            doc_result = await session.run("MATCH (d:Document) RETURN count(d) AS count")
-            doc_record = await doc_result.single()
-            nodes = node_record["count"] if node_record else 0
-            docs = doc_record["count"] if doc_record else 0
-            return {
-                "nodes": nodes,
-                "entities": nodes - docs,
-                "relationships": rel_record["count"] if rel_record else 0,
-                "documents": docs,
-            }
+        # One round-trip; each count is still answered from the count store
+        records = await self.execute_read(
+            """
+            CALL { MATCH (n) RETURN count(n) AS nodes }
+            CALL { MATCH ()-[r]->() RETURN count(r) AS rels }
+            CALL { MATCH (d:Document) RETURN count(d) AS docs }
+            RETURN nodes, rels, docs
+            """
+        )
+        record = records[0] if records else {}
+        nodes = record.get("nodes") or 0
+        docs = record.get("docs") or 0
+        return {
+            "nodes": nodes,
+            "entities": nodes - docs,
+            "relationships": record.get("rels") or 0,
+            "documents": docs,
+        }
 
     async def get_entity_review_candidates(self, ignored_pairs: set[tuple[str, str]], limit: int = 50) -> list[dict]:
         """Find likely duplicate entities for human review."""
-        async with self.driver.session() as session:
+        async with self.driver.session(database=settings.neo4j_database, fetch_size=BULK_READ_FETCH_SIZE) as session:
             result = await session.run(
                 """
                 MATCH (n)
@@ -521,30 +1157,36 @@ class GraphStore:
 
         candidates = []
         for label, group in by_label.items():
-            for i, left in enumerate(group):
-                left_name = left["name"]
-                for right in group[i + 1:]:
-                    pair = tuple(sorted([str(left["uuid"]), str(right["uuid"])]))
-                    if pair[0] == pair[1]:
-                        continue
-                    if pair in ignored_pairs:
-                        continue
-                    right_name = right["name"]
-                    score = fuzz.token_sort_ratio(left_name, right_name)
-                    if score >= 82:
-                        candidates.append({
-                            "score": score,
-                            "label": label,
-                            "left": left,
-                            "right": right,
-                        })
+            if len(group) < 2:
+                continue
+            # Score the whole group in one native cdist pass; the cutoff zeroes
+            # pairs below 82 so only likely duplicates reach the Python loop
+            names = [entity["name"] for entity in group]
+            scores = process.cdist(
+                names, names, scorer=fuzz.token_sort_ratio,
+                score_cutoff=82, dtype=np.float64, workers=-1,
+            )
+            rows, cols = np.nonzero(np.triu(scores, k=1) >= 82)
+            for i, j in zip(rows.tolist(), cols.tolist()):
+                left, right = group[i], group[j]
+                pair = tuple(sorted([str(left["uuid"]), str(right["uuid"])]))
+                if pair[0] == pair[1]:
+                    continue
+                if pair in ignored_pairs:
+                    continue
+                candidates.append({
+                    "score": float(scores[i, j]),
+                    "label": label,
+                    "left": left,
+                    "right": right,
+                })
 
         candidates.sort(key=lambda c: c["score"], reverse=True)
         return candidates[:limit]
 
     async def merge_entities(self, primary_uuid: str, duplicate_uuid: str) -> dict:
         """Merge two entity nodes using APOC refactor, preserving relationships."""
-        async with self.driver.session() as session:
+        async with self.driver.session(database=settings.neo4j_database) as session:
             result = await session.run(
                 """
                 MATCH (primary)
@@ -573,8 +1215,30 @@ class GraphStore:
             record = await result.single()
             if not record:
                 raise ValueError("Entity pair not found")
+            self.invalidate_entity_lookups()
             return {"labels": record["labels"], "properties": record["properties"]}
 
+    async def _search_index_rows(self, terms: list[str], node_type: Optional[str],
+                                 limit: int) -> Optional[list[dict]]:
+        """Top full-text hits for any of `terms` (as prefixes), or None if the
+        entity_search index is unavailable."""
+        try:
+            records = await self.execute_read(
+                """
+                CALL db.index.fulltext.queryNodes('entity_search', $query) YIELD node, score
+                WITH node, score WHERE $node_type IS NULL OR $node_type IN labels(node)
+                RETURN labels(node) AS labels, properties(node) AS props
+                ORDER BY score DESC
+                LIMIT $limit
+                """,
+                query=" OR ".join(f"{term}*" for term in terms),
+                node_type=node_type, limit=limit,
+            )
+        except Exception as e:
+            logger.warning(f"Full-text node search failed, scanning nodes: {e}")
+            return None
+        return [{"labels": r["labels"], "properties": r["props"]} for r in records]
+
     async def search_nodes(self, query: str, node_type: str = None, limit: int = 20) -> list[dict]:
         if node_type and not re.fullmatch(r"[A-Za-z][A-Za-z0-9_]*", node_type):
             raise ValueError(f"Invalid node type: {node_type}")
@@ -583,15 +1247,14 @@ class GraphStore:
         if not terms:
             if not node_type:
                 return []
-            async with self.driver.session() as session:
-                result = await session.run(
-                    f"""
-                    MATCH (n{type_filter})
-                    RETURN labels(n) AS labels, properties(n) AS props
-                    LIMIT 5000
-                    """,
-                )
-                rows = [{"labels": r["labels"], "properties": r["props"]} async for r in result]
+            records = await self.execute_read(
+                f"""
+                MATCH (n{type_filter})
+                RETURN labels(n) AS labels, properties(n) AS props
+                LIMIT 5000
+                """,
+            )
+            rows = [{"labels": r["labels"], "properties": r["props"]} for r in records]
             rows.sort(
                 key=lambda row: (
                     self._first_text((row.get("properties") or {}).get("date")),
@@ -602,15 +1265,18 @@ class GraphStore:
             )
             return rows[:limit]
 
-        async with self.driver.session() as session:
-            result = await session.run(
+        rows = None
+        if not node_type or node_type in ENTITY_SEARCH_LABELS:
+            rows = await self._search_index_rows(terms, node_type, max(limit * SEARCH_CANDIDATES_PER_RESULT, 100))
+        if rows is None:
+            records = await self.execute_read(
                 f"""
                 MATCH (n{type_filter})
                 RETURN labels(n) AS labels, properties(n) AS props
                 LIMIT 5000
                 """,
             )
-            rows = [{"labels": r["labels"], "properties": r["props"]} async for r in result]
+            rows = [{"labels": r["labels"], "properties": r["props"]} for r in records]
 
         scored: list[tuple[int, str, dict]] = []
         for row in rows:
@@ -629,71 +1295,76 @@ class GraphStore:
         return [row for _, _, row in scored[:limit]]
 
     async def get_node(self, node_uuid: str) -> Optional[dict]:
-        async with self.driver.session() as session:
-            result = await session.run(
-                """
-                MATCH (n) WHERE n.uuid = $uuid OR n.paperless_id = $pid
-                OPTIONAL MATCH (n)-[r]-(m)
-                RETURN labels(n) AS labels, properties(n) AS props,
-                       collect({rel_type: type(r), direction: CASE WHEN startNode(r) = n THEN 'out' ELSE 'in' END,
-                               rel_props: properties(r), neighbor_labels: labels(m),
-                               neighbor_props: properties(m)}) AS relationships
-                """,
-                uuid=node_uuid, pid=_try_int(node_uuid),
-            )
-            record = await result.single()
-            if not record:
-                return None
-            return {
-                "labels": record["labels"],
-                "properties": record["props"],
-                "relationships": record["relationships"],
-            }
+        records = await self.execute_read(
+            _match_by_id("n", "$uuid", "$pid") + """
+            OPTIONAL MATCH (n)-[r]-(m)
+            RETURN labels(n) AS labels, properties(n) AS props,
+                   collect({rel_type: type(r), direction: CASE WHEN startNode(r) = n THEN 'out' ELSE 'in' END,
+                           rel_props: properties(r), neighbor_labels: labels(m),
+                           neighbor_props: properties(m)}) AS relationships
+            """,
+            uuid=node_uuid, pid=_try_int(node_uuid),
+        )
+        if not records:
+            return None
+        record = records[0]
+        return {
+            "labels": record["labels"],
+            "properties": record["props"],
+            "relationships": record["relationships"],
+        }
 
-    async def get_neighbors(self, node_uuid: str, depth: int = 2) -> dict:
-        async with self.driver.session() as session:
-            result = await session.run(
-                f"""
-                MATCH (start) WHERE start.uuid = $uuid OR start.paperless_id = $pid
-                CALL apoc.path.subgraphAll(start, {{maxLevel: $depth}})
-                YIELD nodes, relationships
-                RETURN [n IN nodes | {{labels: labels(n), props: properties(n)}}] AS nodes,
-                       [r IN relationships | {{type: type(r), props: properties(r),
-                        start: properties(startNode(r)).uuid, end: properties(endNode(r)).uuid}}] AS rels
-                """,
-                uuid=node_uuid, pid=_try_int(node_uuid), depth=depth,
-            )
-            record = await result.single()
-            if not record:
-                # Fallback without APOC
-                return await self._get_neighbors_no_apoc(node_uuid, depth)
-            return {"nodes": record["nodes"], "relationships": record["rels"]}
+    async def get_neighbors(self, node_uuid: str, depth: int = 2, node_limit: int = NEIGHBOR_NODE_LIMIT,
+                            rel_filter: str = None, label_filter: str = None) -> dict:
+        """Neighborhood of a node within `depth` hops.
+
+        Expansion is breadth-first and stops after `node_limit` nodes, so hubs
+        don't materialize everything reachable; rel_filter/label_filter take
+        APOC relationshipFilter/labelFilter syntax.
+        """
+        config = {"maxLevel": depth, "bfs": True, "limit": node_limit}
+        if rel_filter:
+            config["relationshipFilter"] = rel_filter
+        if label_filter:
+            config["labelFilter"] = label_filter
+        records = await self.execute_read(
+            f"""
+            {_match_by_id("start", "$uuid", "$pid")}
+            CALL apoc.path.subgraphAll(start, $config)
+            YIELD nodes, relationships
+            RETURN [n IN nodes | {{labels: labels(n), props: properties(n)}}] AS nodes,
+                   [r IN relationships | {{type: type(r), props: properties(r),
+                    start: startNode(r).uuid, end: endNode(r).uuid}}] AS rels
+            """,
+            uuid=node_uuid, pid=_try_int(node_uuid), config=config,
+        )
+        if not records:
+            # Fallback without APOC
+            return await self._get_neighbors_no_apoc(node_uuid, depth)
+        return {"nodes": records[0]["nodes"], "relationships": records[0]["rels"]}
 
     async def _get_neighbors_no_apoc(self, node_uuid: str, depth: int) -> dict:
         """Fallback neighborhood query without APOC."""
-        async with self.driver.session() as session:
-            result = await session.run(
-                """
-                MATCH path = (start)-[*1..3]-(end)
-                WHERE start.uuid = $uuid OR start.paperless_id = $pid
-                UNWIND nodes(path) AS n
-                UNWIND relationships(path) AS r
-                WITH collect(DISTINCT {labels: labels(n), props: properties(n)}) AS nodes,
-                     collect(DISTINCT {type: type(r), props: properties(r),
-                             start_uuid: properties(startNode(r)).uuid,
-                             end_uuid: properties(endNode(r)).uuid}) AS rels
-                RETURN nodes, rels
-                """,
-                uuid=node_uuid, pid=_try_int(node_uuid),
-            )
-            record = await result.single()
-            if not record:
-                return {"nodes": [], "relationships": []}
-            return {"nodes": record["nodes"], "relationships": record["rels"]}
+        records = await self.execute_read(
+            _match_by_id("start", "$uuid", "$pid") + f"""
+            MATCH path = (start)-[*1..{_path_depth(depth)}]-(end)
+            UNWIND nodes(path) AS n
+            UNWIND relationships(path) AS r
+            WITH collect(DISTINCT {{labels: labels(n), props: properties(n)}}) AS nodes,
+                 collect(DISTINCT {{type: type(r), props: properties(r),
+                         start_uuid: startNode(r).uuid,
+                         end_uuid: endNode(r).uuid}}) AS rels
+            RETURN nodes, rels
+            """,
+            uuid=node_uuid, pid=_try_int(node_uuid),
+        )
+        if not records:
+            return {"nodes": [], "relationships": []}
+        return {"nodes": records[0]["nodes"], "relationships": records[0]["rels"]}
 
     async def get_initial_graph(self, limit: int = 300) -> dict:
         """Get an initial graph view sampling across ALL entity types (not raw Document nodes)."""
-        async with self.driver.session() as session:
+        async with self.driver.session(database=settings.neo4j_database, fetch_size=BULK_READ_FETCH_SIZE) as session:
             # Sample top nodes from each entity type for a diverse view
             node_result = await session.run(
                 """
@@ -722,8 +1393,8 @@ class GraphStore:
                     labels(a) AS a_labels, properties(a) AS a_props,
                     labels(b) AS b_labels, properties(b) AS b_props,
                     type(r) AS rel_type, properties(r) AS rel_props,
-                    properties(startNode(r)).uuid AS start_uuid,
-                    properties(endNode(r)).uuid AS end_uuid,
+                    startNode(r).uuid AS start_uuid,
+                    endNode(r).uuid AS end_uuid,
                     startNode(r).paperless_id AS start_pid,
                     endNode(r).paperless_id AS end_pid
                 LIMIT 1000
@@ -763,7 +1434,7 @@ class GraphStore:
         """
         if not entity_types:
             return []
-        async with self.driver.session() as session:
+        async with self.driver.session(database=settings.neo4j_database) as session:
             result = await session.run(
                 """
                 MATCH (d:Document)-[r]-(e)
@@ -787,7 +1458,7 @@ class GraphStore:
         """For each Organization in the graph, find the most recent documents.
         Returns list of {org_name, doc_id} dicts, most recent doc per org.
         Perfect for 'what are my bills?' queries — ensures every payee is represented."""
-        async with self.driver.session() as session:
+        async with self.driver.session(database=settings.neo4j_database, fetch_size=BULK_READ_FETCH_SIZE) as session:
             result = await session.run(
                 """
                 MATCH (o:Organization)-[]-(d:Document)
@@ -842,7 +1513,7 @@ class GraphStore:
             for dt in doc_type_map.get(etype, []):
                 relevant_doc_types.add(dt)
 
-        async with self.driver.session() as session:
+        async with self.driver.session(database=settings.neo4j_database, fetch_size=BULK_READ_FETCH_SIZE) as session:
             result = await session.run(
                 """
                 // Strategy 1: Orgs connected to entities of the specified types
@@ -884,7 +1555,7 @@ class GraphStore:
     async def check_health(self) -> dict:
         """Check Neo4j connectivity and return health info."""
         try:
-            async with self.driver.session() as session:
+            async with self.driver.session(database=settings.neo4j_database) as session:
                 result = await session.run("RETURN 1 AS ok")
                 record = await result.single()
                 if record and record["ok"] == 1:
@@ -904,13 +1575,65 @@ def _sanitize_rel_type(rel_type: str) -> str:
     return sanitized or 'RELATED_TO'
 
 
+# Upper bound for variable-length path expansion; cost grows exponentially with hops
+MAX_PATH_DEPTH = 4
+
+
+def _path_depth(depth) -> int:
+    """Clamp a requested traversal depth to 1..MAX_PATH_DEPTH (safe to interpolate)."""
+    return max(1, min(int(depth), MAX_PATH_DEPTH))
+
+
+def _match_by_id(var: str, uuid_ref: str, pid_ref: str, imports: str = "",
+                 label: Optional[str] = None) -> str:
+    """Cypher binding `var` to the node with that uuid or paperless_id.
+
+    With a known `label` this is a single index seek. Otherwise it is a CALL
+    block with one MATCH per constrained label, so each branch is still an
+    index seek; the unlabeled `uuid = $u OR paperless_id = $p` form can use
+    neither index and scans every node.
+    """
+    if label == "Document":
+        return f"MATCH ({var}:Document {{paperless_id: {pid_ref}}})"
+    if label in UUID_LABELS:
+        return f"MATCH ({var}:{label} {{uuid: {uuid_ref}}})"
+    head = f"WITH {imports} " if imports else ""
+    branches = [f"{head}MATCH ({var}:Document {{paperless_id: {pid_ref}}}) RETURN {var}"]
+    branches += [f"{head}MATCH ({var}:{label} {{uuid: {uuid_ref}}}) RETURN {var}" for label in UUID_LABELS]
+    return "CALL {\n" + "\nUNION\n".join(branches) + "\n}"
+
+
+def _id_label(pid: int, label: Optional[str]) -> Optional[str]:
+    # Document ids are paperless ids, whatever label the caller passed; other
+    # labels are only used when they are known (and so safe to splice)
+    if pid >= 0:
+        return "Document"
+    return label if label in UUID_LABELS else None
+
+
+@lru_cache(maxsize=1024)
+def _relationship_query(from_label: Optional[str], to_label: Optional[str], rel_type: str) -> str:
+    """UNWIND MERGE for create_relationships_batch; returns each linked row's `i`."""
+    return f"""
+        UNWIND $rows AS row
+        {_match_by_id("a", "row.from_uuid", "row.from_pid", imports="row", label=from_label)}
+        {_match_by_id("b", "row.to_uuid", "row.to_pid", imports="row", label=to_label)}
+        MERGE (a)-[r:{rel_type}]->(b)
+        ON CREATE SET r = row.props, r.weight = 1
+        ON MATCH SET r.weight = coalesce(r.weight, 1) + 1, r += row.props
+        RETURN row.i AS i
+    """
+
+
 def _try_int(val: str) -> int:
-    try:
-        if isinstance(val, str) and val.startswith("doc-"):
-            val = val[4:]
-        return int(val)
-    except (ValueError, TypeError):
+    # Most ids are uuids; checking digits first avoids raising ValueError for each
+    if isinstance(val, int):
+        return val
+    if not isinstance(val, str):
         return -1
+    if val.startswith("doc-"):
+        val = val[4:]
+    return int(val) if val.isdigit() else -1
 
 
 
@@ -0,0 +1,96 @@
+"""Shared AsyncOpenAI client for all LiteLLM gateway traffic."""
+
+import asyncio
+import time
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from app.config import settings
+
+LLM_KEEPALIVE_SECONDS = 60
+
+_client: Optional[AsyncOpenAI] = None
+
+
+def get_llm_client() -> AsyncOpenAI:
+    """Process-wide client, so every caller reuses one keep-alive connection pool.
+
+    A fresh AsyncOpenAI per call pays a new TCP (and TLS) handshake to the
+    gateway before the first byte.
+    """
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(
+            base_url=settings.litellm_url,
+            api_key=settings.litellm_api_key,
+            # Pool sized for the process's concurrency; connections stay warm across
+            # the gaps between a document's LLM calls (httpx default expiry is 5s)
+            http_client=DefaultAsyncHttpxClient(limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_connections,
+                keepalive_expiry=LLM_KEEPALIVE_SECONDS,
+            )),
+        )
+    return _client
+
+
+async def close_llm_client():
+    global _client
+    if _client is not None:
+        await _client.close()
+        # The next get_llm_client() (e.g. after a lifespan restart) builds a fresh one
+        _client = None
+
+
+class RateLimiter:
+    """Token buckets for requests/min and tokens/min in front of the gateway.
+
+    retry_with_backoff only reacts after a 429; with many documents in flight
+    the first wave reliably trips provider limits and then everything idles
+    in backoff. Acquiring before each call spreads requests out instead.
+    A limit of 0 disables that bucket (both 0: acquire is a no-op).
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self._rpm = rpm
+        self._tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self._rpm:
+            self._requests = min(self._rpm, self._requests + elapsed * self._rpm / 60)
+        if self._tpm:
+            self._tokens = min(self._tpm, self._tokens + elapsed * self._tpm / 60)
+
+    async def acquire(self, est_tokens: int = 0):
+        if not self._rpm and not self._tpm:
+            return
+        # A single request bigger than the whole budget waits for a full bucket
+        est_tokens = min(est_tokens, self._tpm)
+        # Held while sleeping so waiters are served in arrival order
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = 0.0
+                if self._rpm and self._requests < 1:
+                    wait = (1 - self._requests) * 60 / self._rpm
+                if self._tpm and self._tokens < est_tokens:
+                    wait = max(wait, (est_tokens - self._tokens) * 60 / self._tpm)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self._rpm:
+                self._requests -= 1
+            if self._tpm:
+                self._tokens -= est_tokens
+
+
+llm_rate_limiter = RateLimiter(rpm=settings.llm_rpm, tpm=settings.llm_tpm)
@@ -21,6 +21,7 @@ from app.query import query_engine
 from app.entity_resolver import entity_resolver
 from app.entity_steward import entity_steward, SUGGESTION_DECISIONS, TERMINAL_DECISIONS
 from app.cache import get_all_cache_stats, invalidate_on_sync
+from app.llm_client import close_llm_client
 from app.strands_orchestrator import strands_orchestrator
 from app import conversations
 from starlette.responses import StreamingResponse
@@ -488,20 +489,26 @@ async def _run_reindex_documents_task(
                 progress_cb("result", result)
                 results.append(result)
 
-            for doc_id in doc_ids:
-                if cancel_event.is_set():
-                    result = {"doc_id": doc_id, "status": "skipped", "reason": "cancelled"}
+            # Same bounded fan-out as a full sync: documents are LLM-latency bound
+            from app.config import settings
+            semaphore = asyncio.Semaphore(settings.max_concurrent_docs)
+
+            async def _reindex_with_semaphore(doc_id: int) -> dict:
+                async with semaphore:
+                    if cancel_event.is_set():
+                        result = {"doc_id": doc_id, "status": "skipped", "reason": "cancelled"}
+                        progress_cb("result", result)
+                        return result
+                    progress_cb("current", {"title": f"Reindexing document #{doc_id}"})
+                    try:
+                        result = await reindex_document(doc_id)
+                    except Exception as e:
+                        logger.error("Failed to reindex document %s: %s", doc_id, e, exc_info=True)
+                        result = {"doc_id": doc_id, "status": "error", "error": str(e)}
                     progress_cb("result", result)
-                    results.append(result)
-                    continue
-                progress_cb("current", {"title": f"Reindexing document #{doc_id}"})
-                try:
-                    result = await reindex_document(doc_id)
-                except Exception as e:
-                    logger.error("Failed to reindex document %s: %s", doc_id, e, exc_info=True)
-                    result = {"doc_id": doc_id, "status": "error", "error": str(e)}
-                progress_cb("result", result)
-                results.append(result)
+                    return result
+
+            results.extend(await asyncio.gather(*(_reindex_with_semaphore(doc_id) for doc_id in doc_ids)))
 
             errors = sum(1 for r in results if r.get("status") == "error")
             if update_last_sync and errors == 0 and not cancel_event.is_set():
@@ -606,6 +613,7 @@ async def lifespan(app: FastAPI):
     await graph_store.close()
     await embeddings_store.close()
     await conversations.close()
+    await close_llm_client()
 
 
 app = FastAPI(
@@ -727,9 +735,9 @@ async def health():
 
     # LiteLLM (LLM + embeddings gateway)
     try:
-        from openai import AsyncOpenAI
         from app.config import settings
-        client = AsyncOpenAI(base_url=settings.litellm_url, api_key=settings.litellm_api_key)
+        from app.llm_client import get_llm_client
+        client = get_llm_client()
         response = await client.chat.completions.create(
             model=settings.gemini_model,
             messages=[{"role": "user", "content": "Say 'ok'"}],
@@ -20,20 +20,12 @@ CONFIDENCE_THRESHOLD = 0.5
 
 # --- LLM Entity Validation ---
 import json as _json
-from openai import AsyncOpenAI as _AsyncOpenAI
 
 _validation_cache: dict[str, bool] = {}
-_validation_client = None
 
 def _get_validation_client():
-    global _validation_client
-    if _validation_client is None:
-        from app.config import settings
-        _validation_client = _AsyncOpenAI(
-            base_url=settings.litellm_url,
-            api_key=settings.litellm_api_key,
-        )
-    return _validation_client
+    from app.llm_client import get_llm_client
+    return get_llm_client()
 
 ENTITY_VALIDATION_PROMPT = """You are an entity validation and type-correction system for a knowledge graph.
 
@@ -327,11 +319,13 @@ async def process_document(doc: dict) -> dict:
             date=doc_date, content_hash=content_hash,
         )
 
-        # Step 5: Process extracted entities based on doc type
-        await _process_extraction(doc_id, doc_node_id, doc_type, extracted, title=title)
+        # Steps 5/5b buffer their relationships and aliases and write them in one batch
+        async with graph_store.batch_writes():
+            # Step 5: Process extracted entities based on doc type
+            await _process_extraction(doc_id, doc_node_id, doc_type, extracted, title=title)
 
-        # Step 5b: Process implied relationships
-        await _process_implied_relationships(doc_id, extracted)
+            # Step 5b: Process implied relationships
+            await _process_implied_relationships(doc_id, extracted)
 
         # Step 6: Store embeddings — chunk content for granular retrieval
         # D: Filter boilerplate before chunking
@@ -561,13 +555,10 @@ async def _generate_document_summary(doc_id: int, title: str, doc_type: str,
     """Generate a concise document summary capturing key facts for embedding."""
     from app.config import settings as _settings
     from app.retry import retry_with_backoff
-    from openai import AsyncOpenAI
+    from app.llm_client import get_llm_client
 
     try:
-        client = AsyncOpenAI(
-            base_url=_settings.litellm_url,
-            api_key=_settings.litellm_api_key,
-        )
+        client = get_llm_client()
 
         extracted_facts = []
         for key, val in extracted.items():
@@ -728,6 +719,15 @@ async def _process_implied_relationships(doc_id: int, extracted: dict):
 
     source_props = {"source_doc": doc_id, "implied": True}
 
+    # Endpoints that weren't among the document's entities: one lookup per label
+    try:
+        await entity_resolver.prefetch([
+            {"name": rel.get(f"{side}_entity"), "type": rel.get(f"{side}_type", "Person")}
+            for rel in implied if isinstance(rel, dict) for side in ("from", "to")
+        ])
+    except Exception as e:
+        logger.warning(f"Implied relationship prefetch failed for doc {doc_id}: {e}")
+
     for rel in implied:
         try:
             confidence = float(rel.get("confidence", 0.5))
@@ -852,6 +852,11 @@ async def _process_enhanced_entities(doc_id: int, doc_node_id: str, extracted: d
         return
         
     source_props = {"source_doc": doc_id}
+
+    try:
+        await entity_resolver.prefetch(all_entities)
+    except Exception as e:
+        logger.warning(f"Entity lookup prefetch failed for doc {doc_id}: {e}")
     
     for entity in all_entities:
         try:
@@ -931,6 +936,7 @@ async def _process_medical(doc_id, doc_node_id, data, source_props):
             await graph_store.create_relationship(
                 doc_node_id, "Document", phys_uuid, "Person", "AUTHORED_BY", source_props)
 
+    results = []
     for test in (data.get("tests") or []):
         if not test.get("name"):
             continue
@@ -938,7 +944,7 @@ async def _process_medical(doc_id, doc_node_id, data, source_props):
         if test_confidence < CONFIDENCE_THRESHOLD:
             logger.debug(f"Skipping low-confidence test result: {test.get('name')} (conf={test_confidence})")
             continue
-        result_uuid = await graph_store.create_node("MedicalResult", {
+        results.append({
             "test_name": test.get("name", ""),
             "value": str(test.get("value", "")),
             "unit": test.get("unit", "") or "",
@@ -946,6 +952,8 @@ async def _process_medical(doc_id, doc_node_id, data, source_props):
             "flag": test.get("flag", "") or "",
             "confidence": test_confidence,
         })
+    # Lab panels can list dozens of tests; create their nodes in one round-trip
+    for result_uuid in await graph_store.create_nodes("MedicalResult", results):
         await graph_store.create_relationship(
             doc_node_id, "Document", result_uuid, "MedicalResult", "CONTAINS_RESULT", source_props)
 
@@ -1132,20 +1140,19 @@ async def _process_military(doc_id, doc_node_id, data, source_props):
                 doc_node_id, "Document", base_uuid, "Location", "STATIONED_AT", source_props)
 
     # B: Process disability ratings as MedicalResult nodes
-    for rating in (data.get("disability_ratings") or []):
+    ratings = [rating for rating in (data.get("disability_ratings") or []) if rating.get("condition", "")]
+    rating_uuids = await graph_store.create_nodes("MedicalResult", [{
+        "test_name": rating.get("condition", ""),
+        "value": str(rating.get("percentage", "")) + "%" if rating.get("percentage", "") else "",
+        "unit": "percent",
+        "reference_range": "",
+        "flag": rating.get("status", ""),
+        "effective_date": rating.get("effective_date", ""),
+        "confidence": 1.0,
+    } for rating in ratings])
+    for rating, result_uuid in zip(ratings, rating_uuids):
         condition = rating.get("condition", "")
         percentage = rating.get("percentage", "")
-        if not condition:
-            continue
-        result_uuid = await graph_store.create_node("MedicalResult", {
-            "test_name": condition,
-            "value": str(percentage) + "%" if percentage else "",
-            "unit": "percent",
-            "reference_range": "",
-            "flag": rating.get("status", ""),
-            "effective_date": rating.get("effective_date", ""),
-            "confidence": 1.0,
-        })
         await graph_store.create_relationship(
             doc_node_id, "Document", result_uuid, "MedicalResult", "CONTAINS_RESULT", source_props)
         # Link person to condition
@@ -1191,17 +1198,15 @@ async def _process_military(doc_id, doc_node_id, data, source_props):
                     {**source_props, "status": status})
 
     # B: Process benefits (DEA, CHAMPVA, etc.)
-    for benefit in (data.get("benefits") or []):
-        benefit_type = benefit.get("benefit_type", "")
-        if not benefit_type:
-            continue
-        benefit_uuid = await graph_store.create_node("InsurancePolicy", {
-            "policy_number": "",
-            "provider": "Department of Veterans Affairs",
-            "coverage_type": benefit_type,
-            "effective_date": benefit.get("effective_date", ""),
-            "eligibility": benefit.get("eligibility", ""),
-        })
+    benefits = [benefit for benefit in (data.get("benefits") or []) if benefit.get("benefit_type", "")]
+    benefit_uuids = await graph_store.create_nodes("InsurancePolicy", [{
+        "policy_number": "",
+        "provider": "Department of Veterans Affairs",
+        "coverage_type": benefit.get("benefit_type", ""),
+        "effective_date": benefit.get("effective_date", ""),
+        "eligibility": benefit.get("eligibility", ""),
+    } for benefit in benefits])
+    for benefit_uuid in benefit_uuids:
         await graph_store.create_relationship(
             doc_node_id, "Document", benefit_uuid, "InsurancePolicy", "CONTAINS_RESULT", source_props)
 
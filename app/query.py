@@ -8,7 +8,7 @@ from datetime import datetime, timezone
 from collections import Counter, defaultdict
 from typing import Any
 
-from openai import AsyncOpenAI, RateLimitError
+from openai import RateLimitError
 
 from app.config import settings
 
@@ -17,6 +17,7 @@ def _owner_name():
 
 def _owner_context():
     return settings.owner_context or ""
+from app.llm_client import get_llm_client
 from app.retry import retry_with_backoff
 from app.embeddings import chunk_text, embeddings_store
 from app.paperless import paperless_client
@@ -56,13 +57,14 @@ QUERY_CACHE_VERSION = "evidence-v15"
 
 class QueryEngine:
     def __init__(self):
-        self.client = AsyncOpenAI(
-            base_url=settings.litellm_url,
-            api_key=settings.litellm_api_key,
-        )
         self.model = settings.gemini_model
         self._model_override = None
 
+    @property
+    def client(self):
+        # Looked up per call: close_llm_client() drops the shared client on shutdown
+        return get_llm_client()
+
     def _active_model(self, model_override=None):
         return model_override or self._model_override or self.model
 